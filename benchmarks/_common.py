@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+import importlib
+from typing import Callable, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(REPO_ROOT)          # the repository directory is the package (myntds2)
+
+
+def import_module(name: str):
+    """
+    Imports a module of this package by its package-relative name, e.g. 'storage.base'.
+    """
+    parent = os.path.dirname(REPO_ROOT)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+
+    return importlib.import_module(f'{PACKAGE_NAME}.{name}')
+
+
+def best_of(fn: Callable, repeat: int = 3) -> Tuple[float, object]:
+    """
+    Returns the best wall time in seconds over `repeat` runs, and the result of the last run.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
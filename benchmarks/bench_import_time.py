@@ -0,0 +1,90 @@
+"""
+Import-time regression check based on `python -X importtime`.
+
+Each module is imported in a fresh interpreter and its cumulative import time is compared against a threshold.
+Heavy dependencies (mlflow, odps, pandas, pyarrow, oss2, matplotlib, ...) are loaded lazily, so these imports
+should stay well below the thresholds. Exits with status 1 on a regression.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --threshold-ms 80 --repeat 5
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+from _common import REPO_ROOT, PACKAGE_NAME
+
+# Cumulative import time budget per module, in milliseconds
+THRESHOLDS_MS: Dict[str, float] = {
+    'registry': 100,
+    'sql.odps': 100,
+    'storage.base': 100,
+    'storage.oss': 150,
+    'storage.s3': 150,
+    'tracking.utils': 100,
+    'tracking.mlflow': 100,
+    'tracking.mlflow2': 100,
+}
+
+_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+
+    name = f'{PACKAGE_NAME}.{module}'
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(REPO_ROOT))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {name}'],
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total_us = 0
+    heaviest = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, _, imported = int(match[1]), int(match[2]), match[3], match[4]
+        if imported == name:
+            total_us = cumulative_us
+        heaviest.append((self_us / 1000, imported))
+
+    return total_us / 1000, sorted(heaviest, reverse=True)[:5]
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threshold-ms', type=float, default=None, help='overrides every per-module threshold')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('modules', nargs='*', default=list(THRESHOLDS_MS))
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        threshold = args.threshold_ms or THRESHOLDS_MS.get(module, 100)
+        try:
+            runs = [measure(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f'{module:<20} ERROR  {e}')
+            failed = True
+            continue
+
+        best_ms, heaviest = min(runs)
+        status = 'OK' if best_ms <= threshold else 'SLOW'
+        failed |= status == 'SLOW'
+        print(f'{module:<20} {status:<5} {best_ms:8.1f} ms  (threshold {threshold:.0f} ms)')
+        if status == 'SLOW':
+            for self_ms, imported in heaviest:
+                print(f'{"":<27}{self_ms:8.1f} ms  {imported}')
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
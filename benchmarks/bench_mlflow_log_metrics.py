@@ -0,0 +1,67 @@
+"""
+Per-metric logging loop against the batched log_metrics path (one sanitize pass, limit-sized log_batch chunks).
+Runs against a throwaway local sqlite tracking store unless --tracking-uri points at a real server.
+
+    python benchmarks/bench_mlflow_log_metrics.py --keys 2000
+    python benchmarks/bench_mlflow_log_metrics.py --keys 500 --tracking-uri https://mlflow.example.com
+"""
+import os
+import uuid
+import argparse
+import tempfile
+
+from _common import import_module, best_of
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tracking-uri', default=None)
+    args = parser.parse_args()
+
+    from mlflow.tracking import MlflowClient
+    from mlflow.entities import Metric
+
+    utils = import_module('tracking.utils')
+    batching = import_module('tracking.batching')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = args.tracking_uri or f'sqlite:///{os.path.join(tmp, "mlflow.db")}'
+        client = MlflowClient(uri)
+        experiment_id = client.create_experiment(f'bench-log-metrics-{uuid.uuid4().hex[:8]}')
+        run_id = client.create_run(experiment_id).info.run_id
+
+        metrics = {f'fold {i % 10}/val@auc[{i}]': i / args.keys for i in range(args.keys)}
+
+        def per_metric_loop():
+            for key, value in metrics.items():
+                client.log_metric(run_id, utils.sanitize_mlflow_metric_name(key), value, step=0)
+
+        def batched():
+            names, values = utils.prepare_mlflow_metrics(metrics)
+            timestamp = utils.get_current_time_millis()
+            batch = [Metric(name, value, timestamp, 0) for name, value in zip(names, values)]
+            return batching.log_batch_chunked(client, run_id, metrics=batch)
+
+        cases = {
+            'sanitize: per-key regex': lambda: [utils.sanitize_mlflow_metric_name(key) for key in metrics],
+            'sanitize: single pass': lambda: utils.sanitize_mlflow_metric_names(list(metrics)),
+            'log: per-metric loop': per_metric_loop,
+            'log: batched log_metrics': batched,
+        }
+
+        header = f"{'case':<30}{'s':>10}{'metrics/s':>14}"
+        print(f'{args.keys} metrics, tracking uri {uri}')
+        print(header)
+        print('-' * len(header))
+        for name, fn in cases.items():
+            seconds, _ = best_of(fn, args.repeat)
+            print(f'{name:<30}{seconds:>10.4f}{args.keys / seconds:>14,.0f}')
+
+        client.delete_experiment(experiment_id)
+
+
+if __name__ == '__main__':
+    main()
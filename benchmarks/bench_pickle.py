@@ -0,0 +1,57 @@
+"""
+Round-trip speed of the framed protocol-5 pickle format against stdlib pickle on array-heavy objects.
+
+    python benchmarks/bench_pickle.py --mb 512
+"""
+import pickle
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from _common import import_module, best_of
+
+
+def make_object(mb: int):
+
+    n = mb * 1024 * 1024 // 8 // 4
+    rng = np.random.default_rng(0)
+
+    return {
+        'weights': [rng.normal(size=n // 4) for _ in range(4)],
+        'embeddings': rng.normal(size=(n // 64, 64)).astype(np.float32),
+        'frame': pd.DataFrame({'a': rng.normal(size=n), 'b': rng.integers(0, 100, size=n)}),
+        'meta': {'name': 'bench', 'version': 3},
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mb', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pickling = import_module('storage.pickling')
+    obj = make_object(args.mb)
+
+    cases = {
+        'stdlib pickle (default protocol)': (lambda: pickle.dumps(obj), pickle.loads),
+        'framed': (lambda: pickling.dumps(obj), pickling.loads),
+        'framed, read-only arrays': (lambda: pickling.dumps(obj), lambda p: pickling.loads(p, writable=False)),
+        'framed, sha256': (lambda: pickling.dumps(obj, checksum=True), pickling.loads),
+        'framed, hmac': (lambda: pickling.dumps(obj, hmac_key=b'bench'), lambda p: pickling.loads(p, hmac_key=b'bench')),
+        'framed, zlib level 1': (lambda: pickling.dumps(obj, compression='zlib', compression_level=1), pickling.loads),
+    }
+
+    header = f"{'case':<36}{'MB':>9}{'dumps s':>10}{'loads s':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, (dumps, loads) in cases.items():
+        dumps_s, payload = best_of(dumps, args.repeat)
+        loads_s, _ = best_of(lambda: loads(payload), args.repeat)
+        print(f'{name:<36}{len(payload) / 1e6:>9.1f}{dumps_s:>10.3f}{loads_s:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
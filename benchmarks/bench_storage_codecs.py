@@ -0,0 +1,93 @@
+"""
+Encode/decode time, compressed size and end-to-end upload/download time per storage preset.
+
+    python benchmarks/bench_storage_codecs.py                       # in-memory backend, no network
+    python benchmarks/bench_storage_codecs.py --local-dir /nvme/bench
+    python benchmarks/bench_storage_codecs.py --oss-bucket mynt-aa --prefix tmp/bench
+"""
+import argparse
+import uuid
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from _common import import_module, best_of
+
+
+def make_frames(n_rows: int):
+
+    rng = np.random.default_rng(0)
+    numeric = pd.DataFrame({f'f{i}': rng.normal(size=n_rows) for i in range(20)})
+    numeric['label'] = rng.integers(0, 2, size=n_rows)
+
+    categorical = pd.DataFrame({
+        'customer_id': rng.integers(0, 10 ** 9, size=n_rows).astype(str),
+        'segment': rng.choice(['retail', 'sme', 'corporate', 'gov'], size=n_rows),
+        'city': rng.choice([f'city_{i}' for i in range(500)], size=n_rows),
+        'amount': rng.gamma(2.0, 500.0, size=n_rows),
+    })
+
+    mixed = pd.concat([numeric.iloc[:, :8], categorical], axis=1)
+    mixed['ds'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, size=n_rows), unit='D')
+
+    return {'numeric': numeric, 'categorical': categorical, 'mixed': mixed}
+
+
+def make_client(args):
+
+    if args.oss_bucket:
+        return import_module('storage.oss').SimpleOSSClient(bucket_name=args.oss_bucket)
+    if args.s3_bucket:
+        return import_module('storage.s3').SimpleS3Client(bucket=args.s3_bucket)
+
+    backends = import_module('storage.backends')
+    base = import_module('storage.base')
+    if args.local_dir:
+        return base.SimpleStorageClient(backends.LocalBackend(args.local_dir))
+
+    return base.SimpleStorageClient(backends.MemoryBackend())
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--local-dir', default=None)
+    parser.add_argument('--oss-bucket', default=None)
+    parser.add_argument('--s3-bucket', default=None)
+    parser.add_argument('--prefix', default=f'bench/{uuid.uuid4().hex[:8]}')
+    args = parser.parse_args()
+
+    codecs = import_module('storage.codecs')
+    client = make_client(args)
+
+    formats = {
+        'parquet': (codecs.PARQUET_PRESETS, codecs.encode_parquet, pd.read_parquet, client.write_parquet, client.read_parquet),
+        'feather': (codecs.FEATHER_PRESETS, codecs.encode_feather, pd.read_feather, client.write_feather, client.read_feather),
+    }
+
+    header = f"{'frame':<12}{'format':<9}{'preset':<12}{'MB':>9}{'ratio':>7}{'encode s':>10}{'decode s':>10}{'upload s':>10}{'download s':>11}"
+    print(header)
+    print('-' * len(header))
+
+    for frame_name, df in make_frames(args.rows).items():
+        raw_mb = df.memory_usage(deep=True).sum() / 1e6
+        for format_name, (presets, encode, decode, write, read) in formats.items():
+            for preset, options in presets.items():
+                encode_s, data = best_of(lambda: encode(df, options), args.repeat)
+                decode_s, _ = best_of(lambda: decode(BytesIO(data)), args.repeat)
+
+                key = f'{args.prefix}/{frame_name}.{preset}.{format_name}'
+                upload_s, _ = best_of(lambda: write(key, df, preset=preset), args.repeat)
+                download_s, _ = best_of(lambda: read(key), args.repeat)
+                client.backend.delete(key)
+
+                size_mb = len(data) / 1e6
+                print(f'{frame_name:<12}{format_name:<9}{preset:<12}{size_mb:>9.2f}{raw_mb / size_mb:>7.1f}'
+                      f'{encode_s:>10.3f}{decode_s:>10.3f}{upload_s:>10.3f}{download_s:>11.3f}')
+
+
+if __name__ == '__main__':
+    main()
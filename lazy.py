@@ -0,0 +1,25 @@
+import sys
+import importlib.util
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns a module whose body only executes on first attribute access, e.g. `mlflow = lazy_import('mlflow')`.
+    A missing dependency still fails at import time. Use it for top-level packages only: resolving a submodule
+    such as 'matplotlib.pyplot' imports its parent eagerly, so import those inside the function that needs them.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
@@ -0,0 +1,115 @@
+"""
+Process-wide registry of SDK clients (ODPS entries, OSS buckets, S3 clients).
+
+SDK clients are built once per credential set and pool size, on first use, with HTTP connection pools sized for
+our thread counts, so constructing a Simple*Client per task is nearly free. The registry is emptied in forked
+children so connection pools are never shared across processes.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from dotenv import load_dotenv
+
+# Threads per process in our workers (ThreadPoolExecutors default to ~20-32); override with MYNTDS_POOL_SIZE
+DEFAULT_POOL_SIZE = int(os.getenv('MYNTDS_POOL_SIZE', '32'))
+
+_lock = threading.RLock()
+_clients: Dict[Hashable, Any] = {}
+_env_loaded = False
+
+
+def _reset_after_fork():
+
+    global _lock, _env_loaded
+    _lock = threading.RLock()
+    _clients.clear()
+    _env_loaded = True          # the environment is inherited, no need to re-read .env
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def load_env():
+
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+def get_or_create(
+    key: Hashable,
+    factory: Callable[[], Any]
+) -> Any:
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = factory()
+
+    return client
+
+
+def clear():
+
+    with _lock:
+        _clients.clear()
+
+
+def get_odps(
+    access_id: str,
+    secret_access_key: str,
+    project: str,
+    endpoint: str
+):
+
+    # pyodps keeps one requests session per thread and endpoint, so its pool size never limits our thread pools
+    # and is left at the pyodps defaults rather than changed for every ODPS entry in the process
+    def factory():
+        import odps
+        return odps.ODPS(access_id=access_id, secret_access_key=secret_access_key, project=project, endpoint=endpoint)
+
+    return get_or_create(('odps', access_id, secret_access_key, project, endpoint), factory)
+
+
+def get_oss_bucket(
+    access_id: str,
+    secret_access_key: str,
+    endpoint: str,
+    bucket_name: str,
+    pool_size: Optional[int] = None
+):
+
+    pool_size = pool_size or DEFAULT_POOL_SIZE
+
+    def factory():
+        import oss2
+        auth = oss2.Auth(access_key_id=access_id, access_key_secret=secret_access_key)
+        session = get_or_create(('oss-session', pool_size), lambda: oss2.Session(pool_size=pool_size))
+        return oss2.Bucket(auth=auth, endpoint=endpoint, bucket_name=bucket_name, session=session)
+
+    return get_or_create(('oss', access_id, secret_access_key, endpoint, bucket_name, pool_size), factory)
+
+
+def get_s3_client(
+    profile_name: Optional[str] = None,
+    pool_size: Optional[int] = None
+):
+
+    # Low-level clients are thread-safe and can be shared; boto3 resources are not, so callers build their own
+    pool_size = pool_size or DEFAULT_POOL_SIZE
+
+    def factory():
+        import boto3
+        from botocore.config import Config
+        session = boto3.session.Session(profile_name=profile_name)
+        return session.client('s3', config=Config(max_pool_connections=pool_size))
+
+    return get_or_create(('s3', profile_name, pool_size), factory)
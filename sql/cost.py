@@ -0,0 +1,66 @@
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Literal, Optional
+
+
+class CostLimitExceeded(ValueError):
+    pass
+
+
+@dataclass
+class QueryCost:
+    input_bytes: int = 0
+    complexity: float = 0.0
+    udf_num: int = 0
+
+    @classmethod
+    def from_sql_cost(cls,
+        sql_cost: Any
+    ) -> 'QueryCost':
+
+        # pyodps SQLCost: input_size in bytes, complexity, number of UDFs
+        return cls(
+            input_bytes=int(getattr(sql_cost, 'input_size', 0) or 0),
+            complexity=float(getattr(sql_cost, 'complexity', 0) or 0),
+            udf_num=int(getattr(sql_cost, 'udf_num', 0) or 0)
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def __str__(self) -> str:
+        return f'input={self.input_bytes / 1024 ** 3:,.2f} GiB, complexity={self.complexity:g}, udfs={self.udf_num}'
+
+
+@dataclass(frozen=True)
+class CostLimits:
+    max_input_bytes: Optional[int] = None
+    max_complexity: Optional[float] = None
+    on_exceed: Literal['warn', 'raise'] = 'raise'
+
+    def violations(self,
+        cost: QueryCost
+    ) -> List[str]:
+
+        violations = []
+        if self.max_input_bytes is not None and cost.input_bytes > self.max_input_bytes:
+            violations.append(f'input {cost.input_bytes:,} bytes > max_input_bytes {self.max_input_bytes:,}')
+        if self.max_complexity is not None and cost.complexity > self.max_complexity:
+            violations.append(f'complexity {cost.complexity:g} > max_complexity {self.max_complexity:g}')
+
+        return violations
+
+    def check(self,
+        cost: QueryCost,
+        label: str = 'Query'
+    ) -> QueryCost:
+
+        violations = self.violations(cost)
+        if not violations:
+            return cost
+
+        message = f'{label} exceeds cost limits ({"; ".join(violations)})'
+        if self.on_exceed == 'raise':
+            raise CostLimitExceeded(message)
+        print(f'⚠️ {message}')
+
+        return cost
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from ..lazy import lazy_import
+
+pd = lazy_import('pandas')
+pa = lazy_import('pyarrow')
+
+# Types that exist without the MaxCompute 2.0 type system
+ODPS1_TYPES = {'BIGINT', 'DOUBLE', 'STRING', 'BOOLEAN', 'DATETIME', 'DECIMAL'}
+
+_INTEGER_RANGES = [
+    ('TINYINT', -2 ** 7, 2 ** 7 - 1),
+    ('SMALLINT', -2 ** 15, 2 ** 15 - 1),
+    ('INT', -2 ** 31, 2 ** 31 - 1),
+    ('BIGINT', -2 ** 63, 2 ** 63 - 1),
+]
+
+
+def odps_type_from_arrow(
+    arrow_type: pa.DataType,
+    datetime_type: str = 'DATETIME'
+) -> str:
+
+    types = pa.types
+    if types.is_dictionary(arrow_type):                 # pandas category
+        return odps_type_from_arrow(arrow_type.value_type, datetime_type)
+    if types.is_boolean(arrow_type):
+        return 'BOOLEAN'
+    if types.is_integer(arrow_type):
+        # Unsigned types need the next wider signed type
+        bits = arrow_type.bit_width * (2 if types.is_unsigned_integer(arrow_type) else 1)
+        return {8: 'TINYINT', 16: 'SMALLINT', 32: 'INT'}.get(bits, 'BIGINT')
+    if types.is_float16(arrow_type) or types.is_float32(arrow_type):
+        return 'FLOAT'
+    if types.is_float64(arrow_type):
+        return 'DOUBLE'
+    if types.is_decimal(arrow_type):
+        return f'DECIMAL({min(arrow_type.precision, 38)},{arrow_type.scale})'
+    if types.is_timestamp(arrow_type):
+        return 'TIMESTAMP' if arrow_type.tz is not None else datetime_type
+    if types.is_date(arrow_type):
+        return 'DATE'
+    if types.is_binary(arrow_type) or types.is_large_binary(arrow_type) or types.is_fixed_size_binary(arrow_type):
+        return 'BINARY'
+    if types.is_map(arrow_type):
+        key_type = odps_type_from_arrow(arrow_type.key_type, datetime_type)
+        item_type = odps_type_from_arrow(arrow_type.item_type, datetime_type)
+        return f'MAP<{key_type},{item_type}>'
+    if types.is_list(arrow_type) or types.is_large_list(arrow_type) or types.is_fixed_size_list(arrow_type):
+        return f'ARRAY<{odps_type_from_arrow(arrow_type.value_type, datetime_type)}>'
+    if types.is_struct(arrow_type):
+        fields = ','.join(f'{field.name}:{odps_type_from_arrow(field.type, datetime_type)}' for field in arrow_type)
+        return f'STRUCT<{fields}>'
+
+    return 'STRING'         # strings, nulls and anything unknown
+
+
+def narrowest_integer_type(
+    series: pd.Series
+) -> str:
+
+    values = series.dropna()
+    if len(values) == 0:
+        return 'BIGINT'
+
+    low, high = int(values.min()), int(values.max())
+    for sql_type, type_min, type_max in _INTEGER_RANGES:
+        if type_min <= low and high <= type_max:
+            return sql_type
+
+    return 'BIGINT'
+
+
+def downcast_type(
+    series: pd.Series,
+    sql_type: str
+) -> str:
+    """
+    Narrowest type that holds every value of the column without loss, judged from the column statistics.
+    """
+    if sql_type in ('TINYINT', 'SMALLINT', 'INT', 'BIGINT'):
+        return narrowest_integer_type(series)
+
+    if sql_type == 'DOUBLE':
+        values = series.dropna()
+        if len(values) > 0 and (values.astype('float32').astype('float64') == values).all():
+            return 'FLOAT'
+
+    return sql_type
+
+
+def _map_type(
+    values: pd.Series,
+    datetime_type: str
+) -> str:
+
+    # Arrow reads Python dicts as structs; MaxCompute rows of free-form dicts are MAPs
+    keys = [key for value in values for key in value]
+    items = [item for value in values for item in value.values()]
+    try:
+        key_type = odps_type_from_arrow(pa.infer_type(keys), datetime_type) if keys else 'STRING'
+        item_type = odps_type_from_arrow(pa.infer_type(items), datetime_type) if items else 'STRING'
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return 'STRING'
+
+    return f'MAP<{key_type},{item_type}>'
+
+
+def infer_column_type(
+    series: pd.Series,
+    datetime_type: str = 'DATETIME'
+) -> str:
+
+    # Arrow inference covers numpy, nullable and Arrow-backed dtypes, and looks inside object columns
+    # (Decimal, lists, dates, bytes). Columns Arrow cannot convert, e.g. mixed str/int objects, are STRING.
+    if series.dtype == object:
+        values = series.dropna()
+        if len(values) > 0 and all(isinstance(value, dict) for value in values):
+            return _map_type(values, datetime_type)
+
+    try:
+        arrow_type = pa.Array.from_pandas(series).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return 'STRING'
+
+    sql_type = odps_type_from_arrow(arrow_type, datetime_type)
+    if pa.types.is_decimal(arrow_type):
+        # Inferred precision only fits the current values; keep the scale but leave room to grow
+        sql_type = f'DECIMAL(38,{arrow_type.scale})'
+
+    return sql_type
+
+
+def column_list_from_df(
+    df: pd.DataFrame,
+    downcast: bool = False,
+    datetime_type: str = 'DATETIME'
+) -> List[Tuple[str, str]]:
+
+    column_list = []
+    for name, series in df.items():
+        sql_type = infer_column_type(series, datetime_type)
+        if downcast:
+            sql_type = downcast_type(series, sql_type)
+        column_list.append((str(name), sql_type))
+
+    return column_list
+
+
+def needs_odps2_types(
+    column_list: List[Tuple[str, str]]
+) -> bool:
+
+    # DECIMAL(p,s) with explicit precision is also a 2.0 type
+    return any(sql_type not in ODPS1_TYPES for _, sql_type in column_list)
+
+
+def type_system_hints(
+    column_list: List[Tuple[str, str]]
+) -> Dict[str, str]:
+
+    # Session flag rather than a SET statement: script mode only accepts SET at the top of a script
+    return {'odps.sql.type.system.odps2': 'true'} if needs_odps2_types(column_list) else {}
+
+
+def downcast_report(
+    df: pd.DataFrame
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Columns whose type can be narrowed: {column: (inferred type, narrowest safe type)}.
+    """
+    inferred = dict(column_list_from_df(df))
+    narrowed = dict(column_list_from_df(df, downcast=True))
+
+    return {name: (inferred[name], narrowed[name]) for name in inferred if inferred[name] != narrowed[name]}
@@ -0,0 +1,234 @@
+import re
+import time
+import hashlib
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_COMMENTS = re.compile(r'--[^\n]*|/\*[\s\S]*?\*/')
+_LITERALS = re.compile(r"'(?:''|[^'])*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+
+
+def query_fingerprint(
+    query: Optional[str]
+) -> str:
+    """
+    Stable id of a query's shape: comments dropped, string/number literals replaced, whitespace and case folded.
+    Template runs that only differ in partition values share a fingerprint.
+    """
+    if not query:
+        return ''
+
+    normalized = _COMMENTS.sub(' ', query)
+    normalized = _LITERALS.sub('?', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip().lower()
+
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+@dataclass
+class QuerySpan:
+    operation: str
+    query: Optional[str] = None
+    fingerprint: str = ''
+    start_time: float = 0.0                                             # epoch seconds
+    end_time: Optional[float] = None
+    phases: List[Tuple[str, float, float]] = field(default_factory=list)  # (name, start, end), epoch seconds
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    instance_ids: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end_time or time.time()) - self.start_time
+
+    def phase_durations(self) -> Dict[str, float]:
+
+        durations: Dict[str, float] = {}
+        for name, start, end in self.phases:
+            durations[name] = durations.get(name, 0.0) + end - start
+
+        return durations
+
+    @contextmanager
+    def phase(self,
+        name: str
+    ) -> Iterator[None]:
+
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, time.time()))
+
+
+class Instrumentation:
+    """
+    Creates a QuerySpan per client call and hands the finished span to every hook.
+    Hooks are plain callables taking a QuerySpan, e.g. InMemoryCollector or OpenTelemetryHook.
+    """
+
+    def __init__(self,
+        hooks: Optional[List[Callable[[QuerySpan], None]]] = None
+    ):
+
+        self.hooks = list(hooks or [])
+
+    def add_hook(self,
+        hook: Callable[[QuerySpan], None]
+    ):
+
+        self.hooks.append(hook)
+
+    @property
+    def enabled(self) -> bool:
+
+        # Without hooks nobody reads the spans, so optional measurements can be skipped
+        return bool(self.hooks)
+
+    @contextmanager
+    def span(self,
+        operation: str,
+        query: Optional[str] = None,
+        **attributes
+    ) -> Iterator[QuerySpan]:
+
+        span = QuerySpan(
+            operation=operation,
+            query=query,
+            fingerprint=query_fingerprint(query),
+            start_time=time.time(),
+            attributes=attributes
+        )
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            span.end_time = time.time()
+            for hook in self.hooks:
+                try:
+                    hook(span)
+                except Exception as e:
+                    print(f'Instrumentation hook {hook!r} failed: {e}')
+
+
+def _percentile(
+    values: List[float],
+    q: float
+) -> float:
+
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+
+    return ordered[index]
+
+
+class InMemoryCollector:
+    """
+    Hook that keeps the most recent spans and summarizes p50/p95 durations per (operation, query fingerprint).
+    """
+
+    def __init__(self,
+        max_spans: int = 10_000
+    ):
+
+        self.spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def __call__(self,
+        span: QuerySpan
+    ):
+
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self):
+
+        with self._lock:
+            self.spans.clear()
+
+    def summary(self) -> List[Dict[str, Any]]:
+
+        with self._lock:
+            spans = list(self.spans)
+
+        groups: Dict[Tuple[str, str], List[QuerySpan]] = {}
+        for span in spans:
+            groups.setdefault((span.operation, span.fingerprint), []).append(span)
+
+        rows = []
+        for (operation, fingerprint), group in groups.items():
+            durations = [span.duration for span in group]
+            row = {
+                'operation': operation,
+                'fingerprint': fingerprint,
+                'count': len(group),
+                'errors': sum(span.error is not None for span in group),
+                'p50_s': _percentile(durations, 0.50),
+                'p95_s': _percentile(durations, 0.95),
+                'rows': sum(span.rows or 0 for span in group),
+                'bytes': sum(span.bytes or 0 for span in group),
+            }
+
+            phase_names = sorted({name for span in group for name, _, _ in span.phases})
+            for name in phase_names:
+                phase_values = [span.phase_durations().get(name, 0.0) for span in group]
+                row[f'{name}_p50_s'] = _percentile(phase_values, 0.50)
+                row[f'{name}_p95_s'] = _percentile(phase_values, 0.95)
+
+            row['query'] = (group[-1].query or '')[:200]
+            rows.append(row)
+
+        return sorted(rows, key=lambda row: row['p95_s'], reverse=True)
+
+    def summary_df(self):
+
+        import pandas as pd
+        return pd.DataFrame(self.summary())
+
+
+class OpenTelemetryHook:
+    """
+    Re-emits finished spans through an OpenTelemetry tracer (optional dependency), with one child span per phase.
+    """
+
+    def __init__(self,
+        tracer: Any = None
+    ):
+
+        if tracer is None:
+            from opentelemetry import trace
+            tracer = trace.get_tracer('myntds.sql')
+        self.tracer = tracer
+
+    def __call__(self,
+        span: QuerySpan
+    ):
+
+        from opentelemetry import trace
+
+        attributes = {
+            'db.system': 'maxcompute',
+            'db.statement.fingerprint': span.fingerprint,
+            'db.rows': span.rows if span.rows is not None else -1,
+            'db.bytes': span.bytes if span.bytes is not None else -1,
+            'maxcompute.instance_ids': ','.join(span.instance_ids),
+            **{f'myntds.{key}': str(value) for key, value in span.attributes.items()},
+        }
+        parent = self.tracer.start_span(span.operation, start_time=int(span.start_time * 1e9), attributes=attributes)
+        if span.error is not None:
+            parent.set_status(trace.Status(trace.StatusCode.ERROR, span.error))
+
+        context = trace.set_span_in_context(parent)
+        for name, start, end in span.phases:
+            child = self.tracer.start_span(name, context=context, start_time=int(start * 1e9))
+            child.end(end_time=int(end * 1e9))
+
+        parent.end(end_time=int(span.end_time * 1e9))
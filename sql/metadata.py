@@ -0,0 +1,106 @@
+import time
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class MetadataStats:
+    hits: int = 0                   # remote metadata calls saved
+    misses: int = 0                 # remote metadata calls made
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class TableMetadataCache:
+    """
+    In-process cache of table objects (schema, location, modification times) and partition lists, with a TTL
+    and explicit invalidation. One instance is shared by every SimpleODPSClient with the same credentials.
+    """
+
+    def __init__(self,
+        odps_getter: Callable[[], Any],
+        ttl: float = 300
+    ):
+
+        self._odps_getter = odps_getter
+        self.ttl = ttl
+        self.stats = MetadataStats()
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self,
+        key: Hashable,
+        fetch: Callable[[], Any],
+        refresh: bool = False
+    ) -> Any:
+
+        entry = None if refresh else self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            with self._lock:
+                self.stats.hits += 1
+            return entry[1]
+
+        value = fetch()
+        with self._lock:
+            self.stats.misses += 1
+            self._entries[key] = (time.monotonic(), value)
+
+        return value
+
+    def get_table(self,
+        table_name: str,
+        project: Optional[str] = None,
+        refresh: bool = False
+    ) -> Any:
+
+        # refresh=True always reloads, for callers that need current modification times
+        def fetch():
+            table = self._odps_getter().get_table(table_name, project=project)
+            table.reload()              # one round trip; attribute access afterwards is local
+            return table
+
+        return self._get(('table', project, table_name), fetch, refresh=refresh)
+
+    def get_schema(self,
+        table_name: str,
+        project: Optional[str] = None
+    ) -> Any:
+
+        return self.get_table(table_name, project).table_schema
+
+    def get_location(self,
+        table_name: str,
+        project: Optional[str] = None
+    ) -> Optional[str]:
+
+        return self.get_table(table_name, project).location
+
+    def get_partitions(self,
+        table_name: str,
+        project: Optional[str] = None
+    ) -> List[str]:
+
+        def fetch():
+            table = self.get_table(table_name, project)
+            if not table.table_schema.partitions:
+                return []
+            return [str(partition.partition_spec) for partition in table.partitions]
+
+        return self._get(('partitions', project, table_name), fetch)
+
+    def invalidate(self,
+        table_name: Optional[str] = None,
+        project: Optional[str] = None
+    ):
+
+        with self._lock:
+            self.stats.invalidations += 1
+            if table_name is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[2] == table_name and (project is None or key[1] == project):
+                    del self._entries[key]
@@ -1,16 +1,28 @@
+from __future__ import annotations
+
 import os
-import odps
-from odps.df import DataFrame as ODPSDataFrame
-import pandas as pd
-import numpy as np
-from dotenv import load_dotenv
-from typing import List, Tuple, Dict, Callable
+import time
+from collections import deque
+from typing import List, Tuple, Dict, Callable, Literal, Iterable, Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import partial
-from tqdm import tqdm
-from odps.tunnel import TableTunnel
 
 from .utils import random_alphanumeric_string
+from . import dtypes
+from .metadata import TableMetadataCache
+from .instrumentation import Instrumentation, QuerySpan
+from .cost import QueryCost, CostLimits, CostLimitExceeded
+from . import partitions as partition_utils
+from .. import registry
+from ..lazy import lazy_import
+
+# Heavy dependencies load on first use
+odps = lazy_import('odps')
+pd = lazy_import('pandas')
+pa = lazy_import('pyarrow')
+
+# Block ids of one tunnel upload session must be below this
+MAX_TUNNEL_BLOCKS = 20_000
 
 class SimpleODPSClient:
     def __init__(self, 
@@ -18,16 +30,46 @@ class SimpleODPSClient:
         secret_access_key_key: str = 'ODPS_SECRET',
         project_key: str = 'ODPS_PROJECT',
         endpoint: str = 'https://service.ap-southeast-1.maxcompute.aliyun.com/api',
+        metadata_ttl: float = 300,
+        hooks: List[Callable[[QuerySpan], None]] = None,    # e.g. [InMemoryCollector(), OpenTelemetryHook()]
+        max_input_bytes: int = None,                        # preflight thresholds, None disables the check
+        max_complexity: float = None,
+        on_cost_exceeded: Literal['warn', 'raise'] = 'raise'
     ):
         
-        # Load Environment Variables
-        load_dotenv()
-        access_id = os.getenv(access_id_key)
-        secret_access_key = os.getenv(secret_access_key_key)
+        # Load Environment Variables (once per process)
+        registry.load_env()
+        self._access_id = os.getenv(access_id_key)
+        self._secret_access_key = os.getenv(secret_access_key_key)
         self.project = os.getenv(project_key, default='gcash_ml_sandbox')
-        
-        # Initialize ODPS
-        self.o = odps.ODPS(access_id=access_id, secret_access_key=secret_access_key, project=self.project, endpoint=endpoint)
+        self.endpoint = endpoint
+        self.metadata_ttl = metadata_ttl
+
+        # Per-call timings (queue, execute, download, convert, ...) are reported to the hooks
+        self.instrumentation = Instrumentation(hooks)
+
+        # Applied by every call made with preflight=True
+        self.cost_limits = CostLimits(max_input_bytes, max_complexity, on_cost_exceeded)
+
+    @property
+    def o(self) -> odps.ODPS:
+
+        # ODPS entry is built lazily and shared by every client with the same credentials
+        return registry.get_odps(
+            access_id=self._access_id,
+            secret_access_key=self._secret_access_key,
+            project=self.project,
+            endpoint=self.endpoint
+        )
+
+    @property
+    def metadata(self) -> TableMetadataCache:
+
+        # Table schema/location/partition cache, shared by every client with the same credentials and TTL
+        return registry.get_or_create(
+            ('odps-metadata', self._access_id, self.project, self.endpoint, self.metadata_ttl),
+            lambda: TableMetadataCache(lambda: self.o, ttl=self.metadata_ttl)
+        )
 
     #############################################################################################################
     #
@@ -36,20 +78,18 @@ class SimpleODPSClient:
     #############################################################################################################
 
     def run_sql(self,
-        query: str = None
+        query: str = None,
+        hints: Dict[str, str] = None
     ) -> odps.models.Instance:
         
-        return self.o.run_sql(query, hints={"odps.sql.submit.mode" : "script"})
+        return self.o.run_sql(query, hints={"odps.sql.submit.mode" : "script", **(hints or {})})
 
     def run_sql_template(self,
         query_template: str = None,
         args_dict: Dict = None
     ) -> odps.models.Instance:
         
-        for key in args_dict.keys():
-            query_template = query_template.replace('${'+key+'}', args_dict[key])
-
-        return self.run_sql(query_template)
+        return self.run_sql(self.render_template(query_template, args_dict))
 
     def parallel_run_sql_template(self,
         query_template: str = None,
@@ -70,43 +110,146 @@ class SimpleODPSClient:
     #
     #############################################################################################################
 
+    def estimate_cost(self,
+        query: str
+    ) -> QueryCost:
+
+        # COST SQL: compiles the query and reports input size and complexity without running it
+        return QueryCost.from_sql_cost(self.o.execute_sql_cost(query))
+
+    def preflight(self,
+        query: str,
+        label: str = 'Query'
+    ) -> QueryCost:
+
+        cost = self.estimate_cost(query)
+        print(f'{label} estimated cost: {cost}')
+
+        return self.cost_limits.check(cost, label)
+
+    def preflight_many(self,
+        queries: List[str],
+        max_workers: int = None
+    ) -> List[QueryCost]:
+        """
+        Estimates every query concurrently and checks all of them before any is submitted, so an
+        over-limit job aborts the whole fan-out instead of failing half-way through it.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            costs = list(executor.map(self.estimate_cost, queries))
+
+        violations = []
+        for i, cost in enumerate(costs):
+            violations.extend(f'job {i}: {violation}' for violation in self.cost_limits.violations(cost))
+
+        total = QueryCost(
+            input_bytes=sum(cost.input_bytes for cost in costs),
+            complexity=max((cost.complexity for cost in costs), default=0.0),
+            udf_num=max((cost.udf_num for cost in costs), default=0)
+        )
+        print(f'{len(costs)} jobs estimated cost: {total}')
+
+        if violations:
+            message = f'{len(violations)} cost limit violations ({"; ".join(violations)})'
+            if self.cost_limits.on_exceed == 'raise':
+                raise CostLimitExceeded(message)
+            print(f'⚠️ {message}')
+
+        return costs
+
+    def _execute_instance(self,
+        query: str,
+        span: QuerySpan,
+        preflight: bool = False,
+        poll_interval: float = 1.0,
+        hints: Dict[str, str] = None
+    ) -> odps.models.Instance:
+
+        if preflight:
+            with span.phase('preflight'):
+                cost = self.preflight(query)
+            span.attributes['cost'] = cost.as_dict()
+
+        with span.phase('submit'):
+            sql_instance = self.run_sql(query, hints)
+        span.instance_ids.append(sql_instance.id)
+
+        # Queue wait lasts until any task leaves the WAITING state; only measured when a hook will see it,
+        # since it costs a task status request per poll
+        if self.instrumentation.enabled:
+            with span.phase('queue'):
+                waiting = odps.models.Instance.Task.TaskStatus.WAITING
+                while not sql_instance.is_terminated():
+                    if any(task.status != waiting for task in sql_instance.get_task_statuses().values()):
+                        break
+                    time.sleep(poll_interval)
+
+        with span.phase('execute'):
+            sql_instance.wait_for_success()
+
+        return sql_instance
+
     def execute_sql(self,
-        query: str = None
+        query: str = None,
+        preflight: bool = False,
+        hints: Dict[str, str] = None
     ) -> odps.models.Instance:
 
-        return self.o.execute_sql(query, hints={"odps.sql.submit.mode" : "script"})
+        with self.instrumentation.span('execute_sql', query) as span:
+            return self._execute_instance(query, span, preflight, hints=hints)
 
     def execute_sql_to_df(self,
-        query: str = None
+        query: str = None,
+        preflight: bool = False
     ) -> pd.DataFrame:
         
-        sql_instance = self.execute_sql(query)
-    
-        values = []
-        with sql_instance.open_reader() as reader:
-            for record in reader:
-                values.append(record.values)
+        with self.instrumentation.span('execute_sql_to_df', query) as span:
+            sql_instance = self._execute_instance(query, span, preflight)
+        
+            values = []
+            with span.phase('download'):
+                with sql_instance.open_reader() as reader:
+                    for record in reader:
+                        values.append(record.values)
 
-        df = pd.DataFrame(values, columns=list(record._name_indexes.keys()))
+            with span.phase('convert'):
+                df = pd.DataFrame(values, columns=list(record._name_indexes.keys()))
+
+            span.rows = len(df)
+            span.bytes = int(df.memory_usage(deep=False).sum())
                           
         return df
     
     def execute_sql_template(self,
         query_template: str = None,
-        args_dict: Dict = None
+        args_dict: Dict = None,
+        preflight: bool = False
     ) -> odps.models.Instance:
         
+        return self.execute_sql(self.render_template(query_template, args_dict), preflight)
+
+    @staticmethod
+    def render_template(
+        query_template: str,
+        args_dict: Dict
+    ) -> str:
+
         for key in args_dict.keys():
             query_template = query_template.replace('${'+key+'}', args_dict[key])
 
-        return self.execute_sql(query_template)
+        return query_template
     
     def mapreduce_execute_sql_to_df(self,
         query: str = None,              # must be a select statement ONLY
         num_partitions: int = 32,
-        temp_table_name: str = None
+        temp_table_name: str = None,
+        preflight: bool = False
     ) -> pd.DataFrame:
         
+        # The scan happens once, in the partitioning CTAS; the per-partition reads are cheap
+        if preflight:
+            self.preflight(query)
+
         if temp_table_name is None:
             temp_table_name = random_alphanumeric_string(length=10)
 
@@ -123,73 +266,130 @@ class SimpleODPSClient:
             )
         '''
 
-        # a partition blocking function
-        print(f'Dividing query result into {num_partitions} partitions stored in {self.project}.{temp_table_name}')
-        _ = self.execute_sql(partition_query)   
-
-        # map definition
-        def fetch_partition(i):
-            df = self.execute_sql_to_df(
-                f'''
-                SELECT t.`(partition_num)?+.+`
-                FROM {self.project}.{temp_table_name} t
-                WHERE partition_num = '{i+1}'
-                '''
-            )
-
-            return df
-        
-        # map proper
-        result_list = [None] * num_partitions  # preallocate to maintain order
-        with ThreadPoolExecutor(max_workers=num_partitions) as executor:
+        from tqdm import tqdm
 
-            # map
-            future_to_index = {executor.submit(fetch_partition, i): i for i in range(num_partitions)}
+        with self.instrumentation.span('mapreduce_execute_sql_to_df', query, num_partitions=num_partitions) as span:
 
-            # track status
-            for future in tqdm(as_completed(future_to_index), total=num_partitions, desc=f'Fetching partitions from {self.project}.{temp_table_name}: '):
-                i = future_to_index[future]
-                try:
-                    result_list[i] = future.result()
-                except Exception as e:
-                    print(f"Partition {i + 1} failed: {e}")
+            # a partition blocking function
+            print(f'Dividing query result into {num_partitions} partitions stored in {self.project}.{temp_table_name}')
+            with span.phase('partition'):
+                partition_instance = self.execute_sql(partition_query)
+            span.instance_ids.append(partition_instance.id)
 
-        # reduce proper
-        concatenated_df = pd.concat(result_list, ignore_index=True)
+            # map definition
+            def fetch_partition(i):
+                df = self.execute_sql_to_df(
+                    f'''
+                    SELECT t.`(partition_num)?+.+`
+                    FROM {self.project}.{temp_table_name} t
+                    WHERE partition_num = '{i+1}'
+                    '''
+                )
 
-        # delete temp partition table
-        print(f'Dropping temp partition table: {self.project}.{temp_table_name}')
-        self.execute_sql(
-            f'''
-            DROP TABLE IF EXISTS {self.project}.{temp_table_name}; 
-            '''
-        )
+                return df
+            
+            # map proper
+            result_list = [None] * num_partitions  # preallocate to maintain order
+            with span.phase('fetch'), ThreadPoolExecutor(max_workers=num_partitions) as executor:
+
+                # map
+                future_to_index = {executor.submit(fetch_partition, i): i for i in range(num_partitions)}
+
+                # track status
+                for future in tqdm(as_completed(future_to_index), total=num_partitions, desc=f'Fetching partitions from {self.project}.{temp_table_name}: '):
+                    i = future_to_index[future]
+                    try:
+                        result_list[i] = future.result()
+                    except Exception as e:
+                        print(f"Partition {i + 1} failed: {e}")
+
+            # reduce proper
+            with span.phase('convert'):
+                concatenated_df = pd.concat(result_list, ignore_index=True)
+            span.rows = len(concatenated_df)
+            span.bytes = int(concatenated_df.memory_usage(deep=False).sum())
+
+            # delete temp partition table
+            print(f'Dropping temp partition table: {self.project}.{temp_table_name}')
+            with span.phase('cleanup'):
+                self.execute_sql(
+                    f'''
+                    DROP TABLE IF EXISTS {self.project}.{temp_table_name}; 
+                    '''
+                )
 
         return concatenated_df
 
     def execute_sql_template_to_df(self,
         query_template: str = None,
-        args_dict: Dict = None
+        args_dict: Dict = None,
+        preflight: bool = False
     ) -> pd.DataFrame:
         
-        sql_instance = self.execute_sql_template(query_template, args_dict)
+        query = self.render_template(query_template, args_dict)
 
-        with sql_instance.open_reader(tunnel=True, limit=False) as reader:
-            df = reader.to_pandas()
+        with self.instrumentation.span('execute_sql_template_to_df', query) as span:
+            sql_instance = self._execute_instance(query, span, preflight)
+
+            # The tunnel reader downloads and converts in one pass
+            with span.phase('download'):
+                with sql_instance.open_reader(tunnel=True, limit=False) as reader:
+                    df = reader.to_pandas()
+
+            span.rows = len(df)
+            span.bytes = int(df.memory_usage(deep=False).sum())
             
         return df
 
+    def iter_sql_batches(self,
+        query: str = None,
+        batch_rows: int = 100_000,
+        as_arrow: bool = False,
+        preflight: bool = False
+    ) -> Iterator[pd.DataFrame | pa.Table]:
+        """
+        Streams a query result as DataFrames (or Arrow tables) of batch_rows rows, read through the Arrow
+        tunnel, so the full result is never held in memory.
+        """
+        with self.instrumentation.span('iter_sql_batches', query, batch_rows=batch_rows) as span:
+            sql_instance = self._execute_instance(query, span, preflight)
+            span.rows, span.bytes = 0, 0
+
+            def emit(table):
+                span.rows += table.num_rows
+                span.bytes += table.nbytes
+                return table if as_arrow else table.to_pandas(split_blocks=True)
+
+            pending = None
+            with sql_instance.open_reader(tunnel=True, arrow=True, limit=False) as reader:
+                while True:
+                    record_batch = reader.read_next_batch()
+                    if record_batch is None:
+                        break
+                    table = pa.Table.from_batches([record_batch])
+                    pending = table if pending is None else pa.concat_tables([pending, table])
+
+                    # Re-slice the tunnel's batches to exactly batch_rows rows
+                    while pending.num_rows >= batch_rows:
+                        yield emit(pending.slice(0, batch_rows))
+                        pending = pending.slice(batch_rows)
+
+            if pending is not None and pending.num_rows > 0:
+                yield emit(pending)
+
     def parallel_execute_sql_template(self,
         query_template: str = None,
         partition_values_dict: Dict[str, List[str]] = None,
-        max_workers: int = None
+        max_workers: int = None,
+        preflight: bool = False
     ) -> List[odps.models.Instance]:
         
         return self._parallel_executor_template(
             fn_executor=self.execute_sql_template,
             query_template=query_template,
             partition_values_dict=partition_values_dict,
-            max_workers=max_workers
+            max_workers=max_workers,
+            preflight=preflight
         )
 
     #############################################################################################################
@@ -202,7 +402,8 @@ class SimpleODPSClient:
         fn_executor: Callable,
         query_template: str = None,
         partition_values_dict: Dict[str, List[str]] = None,
-        max_workers: int = None
+        max_workers: int = None,
+        preflight: bool = False
     ) -> List[odps.models.Instance]:
         
         assert partition_values_dict, "Must provide at least one partition key with values"
@@ -214,6 +415,10 @@ class SimpleODPSClient:
         num_partitions = partition_lengths[0]
         arg_dicts = [{k: v[i] for k,v in partition_values_dict.items()} for i in range(num_partitions)]
 
+        # Every job is checked before the first one is submitted
+        if preflight:
+            self.preflight_many([self.render_template(query_template, args_dict) for args_dict in arg_dicts], max_workers)
+
         def execute_query(
             query_template: str,
             args_dict: Dict[str, str]
@@ -238,6 +443,69 @@ class SimpleODPSClient:
 
         return futures
 
+    #############################################################################################################
+    #
+    #                                             Partition Methods
+    #
+    #############################################################################################################
+
+    def select_partitions(self,
+        table_name: str,
+        start: partition_utils.DateLike = None,
+        end: partition_utils.DateLike = None,
+        column: str = 'ds',
+        values: List[partition_utils.DateLike] = None,
+        filters: Dict[str, str | List[str]] = None,
+        project: str = None
+    ) -> List[Dict[str, str]]:
+
+        # Only partitions that exist are returned, so missing days never cost a job
+        return partition_utils.select_partitions(
+            self.metadata.get_partitions(table_name, project),
+            column=column,
+            start=start,
+            end=end,
+            values=values,
+            filters=filters
+        )
+
+    def partition_predicate(self,
+        table_name: str,
+        start: partition_utils.DateLike = None,
+        end: partition_utils.DateLike = None,
+        column: str = 'ds',
+        alias: str = None,
+        filters: Dict[str, str | List[str]] = None,
+        project: str = None
+    ) -> str:
+        """
+        Explicit `ds IN ('20240101', ...)` predicate over the existing partitions in [start, end], to use
+        instead of expressions like DATE(ds) BETWEEN ... that MaxCompute cannot prune on.
+        """
+        selected = self.select_partitions(table_name, start, end, column, filters=filters, project=project)
+
+        return partition_utils.in_predicate(column, [partition[column] for partition in selected], alias)
+
+    def partition_fanout(self,
+        table_name: str,
+        start: partition_utils.DateLike = None,
+        end: partition_utils.DateLike = None,
+        column: str = 'ds',
+        keys: List[str] = None,
+        filters: Dict[str, str | List[str]] = None,
+        project: str = None
+    ) -> Dict[str, List[str]]:
+        """
+        One entry per distinct combination of `keys` (default: [column]) among the selected partitions,
+        shaped as the partition_values_dict of parallel_execute_sql_template.
+        """
+        keys = keys or [column]
+        selected = self.select_partitions(table_name, start, end, column, filters=filters, project=project)
+
+        combinations = sorted({tuple(partition[key] for key in keys) for partition in selected})
+
+        return {key: [combination[i] for combination in combinations] for i, key in enumerate(keys)}
+
     #############################################################################################################
     #
     #                                               DDL Methods
@@ -249,7 +517,8 @@ class SimpleODPSClient:
         table_name: str,
         partition_names: List[str] = None,
         force_drop = False,
-        external=False
+        external=False,
+        location: str = None
     ) -> str:
         
         # Header
@@ -269,15 +538,16 @@ class SimpleODPSClient:
 
         columns_string = "".join(columns_strings)
 
-        # Partition Footer
-        partition_string = ''
+        # Partition Footer (also closes the column list)
+        partition_string = ')'
         if partition_names:
             sub_partition_string = ', '.join([f'{x} STRING' for x in partition_names])      # Partition are default to STRING
             partition_string = f')\nPARTITIONED BY ({sub_partition_string})'
 
         # External Storage Footer
         if external:
-            external_string = f'''STORED AS PARQUET\nLOCATION \'oss://oss-ap-southeast-1-internal.aliyuncs.com/mynt-aa/myntds/{table_name}/\' '''
+            location = location or f'oss://oss-ap-southeast-1-internal.aliyuncs.com/mynt-aa/myntds/{table_name}/'
+            external_string = f'''STORED AS PARQUET\nLOCATION \'{location}\' '''
         else:
             external_string = ''
 
@@ -286,30 +556,49 @@ class SimpleODPSClient:
 
         return ddl_string
     
+    def column_list_from_df(self,
+        df: pd.DataFrame,
+        downcast: bool = False,
+        datetime_type: str = 'DATETIME'
+    ) -> List[Tuple[str]]:
+
+        # Pandas/Arrow to MaxCompute Aliyun SQL Types; downcast picks the narrowest type that fits the data
+        column_list = dtypes.column_list_from_df(df, downcast=downcast, datetime_type=datetime_type)
+
+        return column_list
+
+    def column_list_from_odps(self,
+        reference_odps_table_name: str,
+        partition_names: List[str] = None
+    ) -> List[Tuple[str]]:
+
+        schema = self.metadata.get_schema(reference_odps_table_name)
+        table_columns = schema.simple_columns
+
+        column_list = []
+        for column in table_columns:
+            name = column.name
+            sql_type = column.type.name
+            if partition_names and name in partition_names:
+                continue
+
+            column_list.append((name, sql_type.upper()))
+
+        return column_list
+
     def create_ddl_string_from_df(self, 
         df: pd.DataFrame, 
         table_name: str, 
         partition_names: List[str] = None,
         force_drop = False,
-        external = False
+        external = False,
+        downcast: bool = False
     ) -> str:
 
         if isinstance(partition_names, str):
             partition_names = [partition_names] 
 
-        # Pandas to MaxCompute Aliyun SQL Types - Can be extended
-        sql_type_dict = {
-            np.dtype('O'): 'STRING',
-            np.dtype('int64'): 'BIGINT',
-            np.dtype('float64'): 'DOUBLE'
-        }
-
-        # Get the Column list and type
-        column_list = []
-        for i, (col_name, col_type) in enumerate(df.dtypes.items()):
-            sql_type = sql_type_dict.get(col_type, 'STRING')  # Default to STRING if type is unknown
-            column_list.append((col_name, sql_type))
-
+        column_list = self.column_list_from_df(df, downcast=downcast)
         ddl_string = self.create_ddl_string(column_list, table_name, partition_names, force_drop, external)
 
         return ddl_string
@@ -319,11 +608,18 @@ class SimpleODPSClient:
         table_name: str, 
         partition_names: List[str] = None,
         force_drop = False,
-        external = False
+        external = False,
+        downcast: bool = False
     ):
         
-        ddl_string = self.create_ddl_string_from_df(df, table_name, partition_names, force_drop, external)
-        result = self.execute_sql(ddl_string)
+        if isinstance(partition_names, str):
+            partition_names = [partition_names] 
+
+        # TINYINT, INT, FLOAT, TIMESTAMP, ARRAY, MAP etc. need the MaxCompute 2.0 type system
+        column_list = self.column_list_from_df(df, downcast=downcast)
+        ddl_string = self.create_ddl_string(column_list, table_name, partition_names, force_drop, external)
+        result = self.execute_sql(ddl_string, hints=dtypes.type_system_hints(column_list))
+        self.metadata.invalidate(table_name)
 
         return result
 
@@ -338,19 +634,7 @@ class SimpleODPSClient:
         if isinstance(partition_names, str):
             partition_names = [partition_names] 
 
-        table = self.o.get_table(reference_odps_table_name)
-        schema = table.table_schema
-        table_columns = schema.simple_columns
-
-        column_list = []
-        for column in table_columns:
-            name = column.name
-            sql_type = column.type.name
-            if name in partition_names:
-                continue
-
-            column_list.append((name, sql_type.upper()))
-
+        column_list = self.column_list_from_odps(reference_odps_table_name, partition_names)
         ddl_string = self.create_ddl_string(column_list, table_name, partition_names, force_drop, external)
 
         return ddl_string
@@ -362,8 +646,13 @@ class SimpleODPSClient:
         force_drop = False,
         external = False
     ):
-        ddl_string = self.create_ddl_string_from_odps(reference_odps_table_name, table_name, partition_names, force_drop, external)
-        result = self.execute_sql(ddl_string)
+        if isinstance(partition_names, str):
+            partition_names = [partition_names] 
+
+        column_list = self.column_list_from_odps(reference_odps_table_name, partition_names)
+        ddl_string = self.create_ddl_string(column_list, table_name, partition_names, force_drop, external)
+        result = self.execute_sql(ddl_string, hints=dtypes.type_system_hints(column_list))
+        self.metadata.invalidate(table_name)
 
         return result
 
@@ -408,47 +697,170 @@ class SimpleODPSClient:
         n_threads: int = 20,
         method: Literal['arrow', 'record'] = 'arrow'
     ):
-        table = self.o.get_table(table_name)
-        tunnel = TableTunnel(self.o)
 
-        # Open upload session for the target partition
-        upload_session = tunnel.create_upload_session(
-            table_name,
-            partition_spec=partitions,
-            overwrite=overwrite,
-            create_partition=create_partition
-        )
+        with self.instrumentation.span('upload_df_tunnel', None, table_name=table_name, partitions=partitions, method=method) as span:
+            span.rows = len(df)
+            span.bytes = int(df.memory_usage(deep=False).sum())
+
+            table = self.metadata.get_table(table_name)
+            from odps.tunnel import TableTunnel
+            tunnel = TableTunnel(self.o)
+
+            # Open upload session for the target partition
+            with span.phase('session'):
+                upload_session = tunnel.create_upload_session(
+                    table_name,
+                    partition_spec=partitions,
+                    overwrite=overwrite,
+                    create_partition=create_partition
+                )
+            span.instance_ids.append(upload_session.id)
+
+            def _upload_block_arrow(df_chunk, block_id, upload_session):
+                with upload_session.open_arrow_writer(block_id=block_id) as writer:
+                    writer.write(df_chunk)
+
+            def _upload_block_record(df_chunk, block_id, upload_session, col_names):
+                with upload_session.open_record_writer(block_id) as writer:
+                    for row in df_chunk.itertuples(index=False, name=None):
+                        record = upload_session.new_record()
+                        for col, val in zip(col_names, row):
+                            record[col] = None if pd.isna(val) else val
+                        writer.write(record)
+
+            upload_block_fn = None
+            if method == 'arrow':
+                upload_block_fn = _upload_block_arrow
+            elif method == 'record':
+                col_names = [col.name for col in table.table_schema.columns]
+                upload_block_fn = partial(_upload_block_record, col_names=col_names)
+            else:
+                raise ValueError(f"Unknown method: {method}")
 
-        def _upload_block_arrow(df_chunk, block_id, upload_session):
-            with upload_session.open_arrow_writer(block_id=block_id) as writer:
-                writer.write(df_chunk)
-
-        def _upload_block_record(df_chunk, block_id, upload_session, col_names):
-            with upload_session.open_record_writer(block_id) as writer:
-                for row in df_chunk.itertuples(index=False, name=None):
-                    record = upload_session.new_record()
-                    for col, val in zip(col_names, row):
-                        record[col] = None if pd.isna(val) else val
-                    writer.write(record)
-
-        upload_block_fn = None
-        if method == 'arrow':
-            upload_block_fn = _upload_block_arrow
-        elif method == 'record':
-            col_names = [col.name for col in table.table_schema.columns]
-            upload_block_fn = partial(_upload_block_record, col_names=col_names)
-        else:
-            raise ValueError(f"Unknown method: {method}")
+            futures = []
+            with span.phase('upload'), ThreadPoolExecutor(max_workers=n_threads) as executor:
+                for block_id, start in enumerate(range(0, len(df), chunk_size)):
+                    df_chunk = df.iloc[start:start + chunk_size]
+                    futures.append(executor.submit(upload_block_fn, df_chunk, block_id, upload_session))
 
-        futures = []
-        with ThreadPoolExecutor(max_workers=n_threads) as executor:
-            for block_id, start in enumerate(range(0, len(df), chunk_size)):
-                df_chunk = df.iloc[start:start + chunk_size]
-                futures.append(executor.submit(upload_block_fn, df_chunk, block_id, upload_session))
+            # Ensure all blocks succeed before committing
+            for f in futures:
+                f.result()
+
+            with span.phase('commit'):
+                upload_session.commit([i for i in range(len(futures))])
+            if create_partition:
+                self.metadata.invalidate(table_name)
+
+        print(f"🎉 Uploaded {len(df):,} rows into {table_name} partition {partitions} via Arrow Tunnel")
+
+    def upload_batches_tunnel(self,
+        batches: Iterable[pd.DataFrame | pa.Table | pa.RecordBatch],
+        table_name: str,
+        partitions: str = None,
+        overwrite: bool = True,
+        create_partition: bool = True,
+        n_threads: int = 8,
+        min_block_rows: int = 100_000
+    ) -> int:
+        """
+        Streaming counterpart of upload_df_tunnel: consecutive batches are grouped into Arrow blocks of at
+        least min_block_rows rows in a single upload session, committed once every batch is written. At most
+        2 * n_threads blocks are held at a time, so a generator (e.g. iter_sql_batches piped through scoring)
+        is consumed with bounded memory. A session takes at most MAX_TUNNEL_BLOCKS blocks; running out raises
+        before anything is committed.
+        """
+        from odps.tunnel import TableTunnel
+
+        with self.instrumentation.span('upload_batches_tunnel', None, table_name=table_name, partitions=partitions) as span:
+            tunnel = TableTunnel(self.o)
+            with span.phase('session'):
+                upload_session = tunnel.create_upload_session(
+                    table_name,
+                    partition_spec=partitions,
+                    overwrite=overwrite,
+                    create_partition=create_partition
+                )
+            span.instance_ids.append(upload_session.id)
+
+            def _upload_block(block, block_id):
+                with upload_session.open_arrow_writer(block_id=block_id) as writer:
+                    for batch in block:
+                        writer.write(batch)
+
+            def _submit(block):
+                block_id = len(block_ids)
+                if block_id >= MAX_TUNNEL_BLOCKS:
+                    raise ValueError(f"Upload needs more than {MAX_TUNNEL_BLOCKS:,} tunnel blocks; increase min_block_rows (now {min_block_rows:,})")
+                in_flight.append(executor.submit(_upload_block, block, block_id))
+                block_ids.append(block_id)
+                if len(in_flight) >= 2 * n_threads:
+                    in_flight.popleft().result()
+
+            # Includes the time spent producing the batches
+            in_flight, block_ids, rows = deque(), [], 0
+            with span.phase('upload'), ThreadPoolExecutor(max_workers=n_threads) as executor:
+                block, block_rows = [], 0
+                for batch in batches:
+                    block.append(batch)
+                    block_rows += len(batch)
+                    rows += len(batch)
+                    if block_rows >= min_block_rows:
+                        _submit(block)
+                        block, block_rows = [], 0
+                if block:
+                    _submit(block)
+                while in_flight:
+                    in_flight.popleft().result()
+
+            with span.phase('commit'):
+                upload_session.commit(block_ids)
+            span.rows = rows
+            if create_partition:
+                self.metadata.invalidate(table_name)
+
+        print(f"🎉 Uploaded {rows:,} rows in {len(block_ids):,} blocks into {table_name} partition {partitions} via Arrow Tunnel")
+
+        return rows
+
+    # Server-side load: data already on OSS never passes through this machine
+    def load_from_oss(self,
+        table_name: str,
+        oss_location: str,
+        column_list: List[Tuple[str]] = None,
+        partitions: str = None,
+        external_table_name: str = None,
+        overwrite: bool = True,
+        drop_external: bool = False
+    ) -> odps.models.Instance:
 
-        # Ensure all blocks succeed before committing
-        for f in futures:
-            f.result()
+        # Columns default to the (existing) target table's non-partition columns
+        if column_list is None:
+            schema = self.metadata.get_schema(table_name)
+            column_list = [(column.name, column.type.name.upper()) for column in schema.simple_columns]
+
+        # Partition spec "ds='20240101',region='ph'" -> ['ds', 'region']
+        partition_names = [spec.split('=')[0].strip() for spec in partitions.split(',')] if partitions else None
+        partition_string = f' PARTITION ({partitions})' if partitions else ''
+
+        # One external table per target partition, so concurrent loads of different partitions never share one
+        external_table_name = external_table_name or '_'.join(filter(None, [table_name, partition_utils.partition_slug(partitions), 'oss_ext']))
+        columns_string = ', '.join(f'`{name}`' for name, _ in column_list)
+
+        # Recreate the external table so its LOCATION is always this prefix, create the managed table if needed, then copy
+        script = '\n'.join([
+            f'DROP TABLE IF EXISTS {self.project}.{external_table_name};',
+            self.create_ddl_string(column_list, external_table_name, external=True, location=oss_location),
+            self.create_ddl_string(column_list, table_name, partition_names=partition_names),
+            f"INSERT {'OVERWRITE' if overwrite else 'INTO'} TABLE {self.project}.{table_name}{partition_string}",
+            f"SELECT {columns_string} FROM {self.project}.{external_table_name};",
+        ])
+        if drop_external:
+            script += f'\nDROP TABLE IF EXISTS {self.project}.{external_table_name};'
+
+        print(f"Loading {oss_location} into {self.project}.{table_name}{partition_string} via {external_table_name}")
+        result = self.execute_sql(script, hints=dtypes.type_system_hints(column_list))
+        self.metadata.invalidate(table_name)
+        self.metadata.invalidate(external_table_name)
 
-        upload_session.commit([i for i in range(len(futures))])
-        print(f"🎉 Uploaded {len(df):,} rows into {table_name} partition {partitions} via Arrow Tunnel")
\ No newline at end of file
+        return result
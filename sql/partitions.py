@@ -0,0 +1,133 @@
+import re
+import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+DateLike = Union[str, datetime.date, datetime.datetime]
+
+_SPEC_ITEM = re.compile(r"\s*([^=,\s]+)\s*=\s*(?:'([^']*)'|\"([^\"]*)\"|([^,]*))\s*(?:,|$)")
+
+# Partition value layouts recognized for date-like columns, most common first
+_DATE_FORMATS = [
+    (re.compile(r'^\d{8}$'), '%Y%m%d'),
+    (re.compile(r'^\d{4}-\d{2}-\d{2}$'), '%Y-%m-%d'),
+    (re.compile(r'^\d{4}/\d{2}/\d{2}$'), '%Y/%m/%d'),
+    (re.compile(r'^\d{6}$'), '%Y%m'),
+    (re.compile(r'^\d{4}-\d{2}$'), '%Y-%m'),
+]
+
+
+def parse_partition_spec(
+    spec: str
+) -> Dict[str, str]:
+    """
+    "ds='20240101',region='ph'" -> {'ds': '20240101', 'region': 'ph'}. Quotes are optional.
+    """
+    values = {}
+    for match in _SPEC_ITEM.finditer(spec):
+        name, single, double, bare = match.groups()
+        values[name] = next(value for value in (single, double, bare) if value is not None).strip()
+
+    return values
+
+
+def partition_slug(
+    spec: Optional[str]
+) -> str:
+    """
+    "ds='20240101',region='ph'" -> 'ds_20240101_region_ph', for naming per-partition tables and prefixes.
+    """
+    if not spec:
+        return ''
+
+    return re.sub(r'[^0-9a-z]+', '_', '_'.join(f'{name}_{value}' for name, value in parse_partition_spec(spec).items()).lower()).strip('_')
+
+
+def detect_date_format(
+    values: Sequence[str]
+) -> Optional[str]:
+
+    for pattern, fmt in _DATE_FORMATS:
+        if values and all(pattern.match(value) for value in values):
+            return fmt
+
+    return None
+
+
+def to_partition_value(
+    value: DateLike,
+    fmt: Optional[str]
+) -> str:
+
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime(fmt or '%Y%m%d')
+
+    value = str(value)
+    if fmt is None:
+        return value
+
+    # Re-render strings written in another known layout, e.g. '2024-01-01' against ds=20240101
+    for pattern, other_fmt in _DATE_FORMATS:
+        if pattern.match(value):
+            return datetime.datetime.strptime(value, other_fmt).strftime(fmt)
+
+    return value
+
+
+def select_partitions(
+    partition_specs: List[str],
+    column: str = 'ds',
+    start: DateLike = None,
+    end: DateLike = None,
+    values: Sequence[DateLike] = None,
+    filters: Dict[str, Union[str, Sequence[str]]] = None
+) -> List[Dict[str, str]]:
+    """
+    Existing partitions whose `column` lies in [start, end] (inclusive, either bound optional) and/or in
+    `values`, and whose other columns match `filters`. Bounds are rendered in the layout the table
+    actually uses, so date-like values compare correctly as strings.
+    """
+    partitions = [parse_partition_spec(spec) for spec in partition_specs]
+    partitions = [partition for partition in partitions if column in partition]
+
+    fmt = detect_date_format([partition[column] for partition in partitions])
+    low = to_partition_value(start, fmt) if start is not None else None
+    high = to_partition_value(end, fmt) if end is not None else None
+    wanted = {to_partition_value(value, fmt) for value in values} if values is not None else None
+
+    selected = []
+    for partition in partitions:
+        value = partition[column]
+        if low is not None and value < low:
+            continue
+        if high is not None and value > high:
+            continue
+        if wanted is not None and value not in wanted:
+            continue
+        if filters and not all(
+            partition.get(name) in ([allowed] if isinstance(allowed, str) else allowed)
+            for name, allowed in filters.items()
+        ):
+            continue
+        selected.append(partition)
+
+    return sorted(selected, key=lambda partition: partition[column])
+
+
+def quote_literal(
+    value: str
+) -> str:
+
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def in_predicate(
+    column: str,
+    values: Sequence[str],
+    alias: str = None
+) -> str:
+
+    column_ref = f'{alias}.{column}' if alias else column
+    if not values:
+        return '1 = 0'          # nothing to scan; IN () is a syntax error
+
+    return f'{column_ref} IN ({", ".join(quote_literal(value) for value in sorted(set(values)))})'
@@ -0,0 +1,319 @@
+import os
+import time
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class ObjectNotFound(KeyError):
+    pass
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[float] = None      # seconds since the epoch
+
+
+class StorageBackend(ABC):
+    """
+    Minimal object-store protocol shared by every storage client.
+    Format codecs (feather, parquet, pickle) live in SimpleStorageClient and only talk to this interface.
+    """
+
+    # Payloads above this size are sent through put_multipart by backends that support it
+    multipart_threshold: int = 64 * 1024 * 1024
+    multipart_chunksize: int = 16 * 1024 * 1024
+
+    @abstractmethod
+    def get(self,
+        key: str
+    ) -> bytes:
+        ...
+
+    @abstractmethod
+    def get_range(self,
+        key: str,
+        offset: int,
+        length: int
+    ) -> bytes:
+        ...
+
+    @abstractmethod
+    def put(self,
+        key: str,
+        data: bytes
+    ) -> ObjectInfo:
+        ...
+
+    @abstractmethod
+    def put_multipart(self,
+        key: str,
+        parts: Iterable[bytes]
+    ) -> ObjectInfo:
+        ...
+
+    @abstractmethod
+    def head(self,
+        key: str
+    ) -> ObjectInfo:
+        ...
+
+    @abstractmethod
+    def list(self,
+        prefix: str = ''
+    ) -> Iterator[ObjectInfo]:
+        ...
+
+    @abstractmethod
+    def delete(self,
+        key: str
+    ):
+        ...
+
+    def list_delimited(self,
+        prefix: str = ''
+    ) -> Tuple[List[ObjectInfo], List[str]]:
+
+        # One directory level: objects directly under prefix, and the sub-prefixes ('dir/') below it.
+        # Object stores override this with a delimiter listing instead of walking every key.
+        objects, prefixes = [], set()
+        for info in self.list(prefix):
+            head, sep, _ = info.key[len(prefix):].partition('/')
+            if sep:
+                prefixes.add(f'{prefix}{head}/')
+            else:
+                objects.append(info)
+
+        return objects, sorted(prefixes)
+
+    def exists(self,
+        key: str
+    ) -> bool:
+
+        try:
+            self.head(key)
+        except ObjectNotFound:
+            return False
+
+        return True
+
+    def local_path(self,
+        key: str
+    ) -> Optional[str]:
+
+        # Path of an on-disk copy of the object, if the backend has one; enables memory-mapped reads
+        return None
+
+    def _iter_chunks(self,
+        data: bytes
+    ) -> Iterator[bytes]:
+
+        view = memoryview(data)
+        for start in range(0, len(view), self.multipart_chunksize):
+            yield view[start:start + self.multipart_chunksize]
+
+
+#############################################################################################################
+#
+#                                            Local Disk Backend
+#
+#############################################################################################################
+
+class LocalBackend(StorageBackend):
+    def __init__(self,
+        root: str
+    ):
+
+        self.root = os.path.abspath(root)
+        self.namespace = f'file://{self.root}'
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self,
+        key: str
+    ) -> str:
+
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Key '{key}' resolves outside of the backend root '{self.root}'")
+
+        return path
+
+    def local_path(self,
+        key: str
+    ) -> Optional[str]:
+
+        path = self.path(key)
+        if not os.path.isfile(path):
+            raise ObjectNotFound(key)
+
+        return path
+
+    def get(self,
+        key: str
+    ) -> bytes:
+
+        try:
+            with open(self.path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError as e:
+            raise ObjectNotFound(key) from e
+
+    def get_range(self,
+        key: str,
+        offset: int,
+        length: int
+    ) -> bytes:
+
+        try:
+            with open(self.path(key), 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+        except FileNotFoundError as e:
+            raise ObjectNotFound(key) from e
+
+    def put(self,
+        key: str,
+        data: bytes
+    ) -> ObjectInfo:
+
+        return self.put_multipart(key, [data])
+
+    def put_multipart(self,
+        key: str,
+        parts: Iterable[bytes]
+    ) -> ObjectInfo:
+
+        # Write to a temp file and rename so readers never observe a partial object
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                for part in parts:
+                    f.write(part)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return self.head(key)
+
+    def head(self,
+        key: str
+    ) -> ObjectInfo:
+
+        try:
+            stat = os.stat(self.path(key))
+        except FileNotFoundError as e:
+            raise ObjectNotFound(key) from e
+
+        # Cheap nginx-style etag from mtime and size, avoids hashing the whole file
+        etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+        return ObjectInfo(key=key, size=stat.st_size, etag=etag, last_modified=stat.st_mtime)
+
+    def list(self,
+        prefix: str = ''
+    ) -> Iterator[ObjectInfo]:
+
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith('.tmp'):
+                    continue
+                key = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    yield self.head(key)
+
+    def delete(self,
+        key: str
+    ):
+
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+#############################################################################################################
+#
+#                                            In-Memory Backend
+#
+#############################################################################################################
+
+class MemoryBackend(StorageBackend):
+    def __init__(self):
+
+        self.namespace = f'memory://{id(self):x}'
+        self._objects: Dict[str, bytes] = {}
+        self._infos: Dict[str, ObjectInfo] = {}
+        self._lock = threading.Lock()
+
+    def get(self,
+        key: str
+    ) -> bytes:
+
+        try:
+            return self._objects[key]
+        except KeyError as e:
+            raise ObjectNotFound(key) from e
+
+    def get_range(self,
+        key: str,
+        offset: int,
+        length: int
+    ) -> bytes:
+
+        return self.get(key)[offset:offset + length]
+
+    def put(self,
+        key: str,
+        data: bytes
+    ) -> ObjectInfo:
+
+        data = bytes(data)
+        info = ObjectInfo(key=key, size=len(data), etag=hashlib.md5(data).hexdigest(), last_modified=time.time())
+        with self._lock:
+            self._objects[key] = data
+            self._infos[key] = info
+
+        return info
+
+    def put_multipart(self,
+        key: str,
+        parts: Iterable[bytes]
+    ) -> ObjectInfo:
+
+        return self.put(key, b''.join(parts))
+
+    def head(self,
+        key: str
+    ) -> ObjectInfo:
+
+        try:
+            return self._infos[key]
+        except KeyError as e:
+            raise ObjectNotFound(key) from e
+
+    def list(self,
+        prefix: str = ''
+    ) -> Iterator[ObjectInfo]:
+
+        with self._lock:
+            infos: List[ObjectInfo] = [info for key, info in sorted(self._infos.items()) if key.startswith(prefix)]
+
+        yield from infos
+
+    def delete(self,
+        key: str
+    ):
+
+        with self._lock:
+            self._objects.pop(key, None)
+            self._infos.pop(key, None)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+
+from ..lazy import lazy_import
+from .backends import StorageBackend
+from .cache import DiskCache, CachedBackend
+from .codecs import resolve_parquet_options, resolve_feather_options, encode_parquet, encode_feather
+from . import pickling
+from .backends import ObjectInfo
+from .scheduling import plan_parquet_reads, read_parquet_units
+
+pd = lazy_import('pandas')
+pa = lazy_import('pyarrow')
+
+
+class SimpleStorageClient:
+    """
+    Format codecs on top of a StorageBackend. SimpleOSSClient and SimpleS3Client only differ in their backend,
+    so any backend (including LocalBackend and MemoryBackend) can be used for offline tests and benchmarks.
+    """
+
+    def __init__(self,
+        backend: StorageBackend,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = 50 * 1024 ** 3
+    ):
+
+        # Opt-in read-through disk cache, e.g. on local NVMe shared by every job on the host
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = DiskCache(cache_dir=cache_dir, max_bytes=cache_max_bytes)
+            backend = CachedBackend(backend, self.cache)
+
+        self.backend = backend
+
+    def cache_stats(self) -> Optional[Dict[str, int]]:
+
+        return self.cache.stats.as_dict() if self.cache is not None else None
+
+    def write_bytes(self,
+        key: str,
+        data: bytes
+    ):
+
+        if len(data) > self.backend.multipart_threshold:
+            self.backend.put_multipart(key, self.backend._iter_chunks(data))
+        else:
+            self.backend.put(key, data)
+
+    def read_bytes(self,
+        key: str
+    ) -> bytes:
+
+        return self.backend.get(key)
+
+    def list_keys(self,
+        prefix: str = ''
+    ) -> List[str]:
+
+        return [info.key for info in self.backend.list(prefix)]
+
+    def write_feather(self,
+        key: str,
+        df: pd.DataFrame,
+        preset: Optional[str] = None,           # 'default', 'fast-write', 'small-size' or 'fast-scan'
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        chunksize: Optional[int] = None
+    ):
+
+        options = resolve_feather_options(
+            preset, compression=compression, compression_level=compression_level, chunksize=chunksize)
+        data = encode_feather(df, options)
+
+        self.write_bytes(key, data)
+
+    def read_arrow(self,
+        key: str,
+        memory_map: bool = True
+    ) -> pa.Table:
+
+        import pyarrow.feather as feather
+
+        # Memory-map the local copy when there is one: processes reading the same snapshot share the page cache.
+        # Only uncompressed feather files are truly zero-copy, compressed buffers are decompressed into memory.
+        path = self.backend.local_path(key) if memory_map else None
+        if path is not None:
+            try:
+                return feather.read_table(path, memory_map=True)
+            except FileNotFoundError:       # evicted from the disk cache since local_path
+                pass
+
+        return feather.read_table(pa.BufferReader(self.read_bytes(key)))
+
+    def read_feather(self,
+        key: str,
+        memory_map: bool = True
+    ) -> pd.DataFrame:
+
+        # split_blocks keeps null-free numeric columns as views over the Arrow buffers instead of consolidating
+        table = self.read_arrow(key, memory_map=memory_map)
+        df = table.to_pandas(split_blocks=True)
+
+        return df
+
+    def write_parquet(self,
+        key: str,
+        df: pd.DataFrame,
+        preset: Optional[str] = None,           # 'default', 'fast-write', 'small-size' or 'fast-scan'
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        row_group_size: Optional[int] = None,
+        use_dictionary: Optional[bool] = None
+    ):
+
+        options = resolve_parquet_options(
+            preset,
+            compression=compression,
+            compression_level=compression_level,
+            row_group_size=row_group_size,
+            use_dictionary=use_dictionary
+        )
+        data = encode_parquet(df, options)
+
+        self.write_bytes(key, data)
+
+    def read_parquet(self,
+        key: str
+    ) -> pd.DataFrame:
+
+        bytes_object = BytesIO(self.read_bytes(key))
+        df = pd.read_parquet(bytes_object)
+
+        return df
+
+    def read_parquet_many(self,
+        objects: List[ObjectInfo],
+        max_workers: int = 16,
+        split_bytes: Optional[int] = 256 * 1024 ** 2,
+        progress: bool = True
+    ) -> List[pd.DataFrame]:
+
+        # The disk cache stores whole objects, so splitting by row group would only make workers race for them
+        if self.cache is not None:
+            split_bytes = None
+
+        units = plan_parquet_reads(self.backend, objects, split_bytes=split_bytes, max_workers=max_workers)
+        frames = read_parquet_units(self.backend, units, max_workers=max_workers, progress=progress)
+
+        return frames
+
+    def write_pickle(self,
+        key: str,
+        data: Any,
+        compression: Optional[str] = None,     # None, 'zlib', 'lzma', 'zstd' or 'lz4'
+        compression_level: Optional[int] = None,
+        checksum: bool = False,
+        hmac_key: Optional[bytes] = None        # defaults to the PICKLE_HMAC_KEY environment variable
+    ):
+
+        payload = pickling.dumps(
+            data,
+            compression=compression,
+            compression_level=compression_level,
+            checksum=checksum,
+            hmac_key=hmac_key
+        )
+
+        self.write_bytes(key, payload)
+
+    def read_pickle(self,
+        key: str,
+        hmac_key: Optional[bytes] = None,
+        writable: bool = True                   # False skips one copy, unpickled arrays become read-only views
+    ) -> Any:
+
+        # Integrity is verified before anything is unpickled
+        data = pickling.loads(self.read_bytes(key), hmac_key=hmac_key, writable=writable)
+
+        return data
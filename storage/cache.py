@@ -0,0 +1,294 @@
+import os
+import glob
+import fcntl
+import hashlib
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .backends import StorageBackend, ObjectInfo
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0            # bytes served from disk instead of the network
+    bytes_downloaded: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class DiskCache:
+    """
+    Size-bounded LRU cache of object payloads on local disk, keyed by namespace + key + ETag.
+    Recency is tracked through file mtimes, so several processes on one host can share the same directory.
+    The directory is only scanned for eviction once the bytes stored since the last scan could push it past
+    max_bytes; entries written by other processes are picked up at that scan.
+    """
+
+    def __init__(self,
+        cache_dir: str,
+        max_bytes: int = 50 * 1024 ** 3
+    ):
+
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._estimated_bytes: Optional[int] = None         # size after the last scan plus bytes stored since
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _key_digest(self,
+        namespace: str,
+        key: str
+    ) -> str:
+
+        return hashlib.sha256(f'{namespace}\0{key}'.encode()).hexdigest()
+
+    def path(self,
+        namespace: str,
+        key: str,
+        etag: str
+    ) -> str:
+
+        key_digest = self._key_digest(namespace, key)
+        etag_digest = hashlib.sha1(etag.encode()).hexdigest()[:16]
+
+        return os.path.join(self.cache_dir, key_digest[:2], f'{key_digest}-{etag_digest}')
+
+    def lookup(self,
+        namespace: str,
+        key: str,
+        etag: str
+    ) -> Optional[str]:
+
+        path = self.path(namespace, key, etag)
+        try:
+            os.utime(path)              # bump recency for LRU
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def store(self,
+        namespace: str,
+        key: str,
+        etag: str,
+        data: bytes
+    ) -> str:
+
+        path = self.path(namespace, key, etag)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Atomic publish: concurrent readers either see the full file or nothing
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        # Older versions of the same object can never be hit again
+        for stale_path in glob.glob(os.path.join(os.path.dirname(path), f'{self._key_digest(namespace, key)}-*')):
+            if stale_path != path and not stale_path.endswith('.tmp'):
+                self._remove(stale_path)
+
+        with self._lock:
+            if self._estimated_bytes is None:
+                self._estimated_bytes = self.size()
+            else:
+                self._estimated_bytes += len(data)
+            over_budget = self._estimated_bytes > self.max_bytes
+
+        # The entry just written always survives, even when it alone exceeds max_bytes
+        if over_budget:
+            self.evict(keep=path)
+
+        return path
+
+    def invalidate(self,
+        namespace: str,
+        key: str
+    ):
+
+        key_digest = self._key_digest(namespace, key)
+        for path in glob.glob(os.path.join(self.cache_dir, key_digest[:2], f'{key_digest}-*')):
+            self._remove(path)
+
+    def size(self) -> int:
+
+        return sum(size for _, size, _ in self._scan())
+
+    def evict(self,
+        keep: Optional[str] = None
+    ):
+
+        # Serialize eviction across processes; readers are never blocked
+        with open(os.path.join(self.cache_dir, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                entries = sorted(self._scan(), key=lambda entry: entry[2])
+                total = sum(size for _, size, _ in entries)
+                for path, size, _ in entries:
+                    if total <= self.max_bytes:
+                        break
+                    if path != keep and self._remove(path):
+                        total -= size
+                        with self._lock:
+                            self.stats.evictions += 1
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        with self._lock:
+            self._estimated_bytes = total
+
+    def clear(self):
+
+        for path, _, _ in self._scan():
+            self._remove(path)
+
+        with self._lock:
+            self._estimated_bytes = None
+
+    def _scan(self) -> Iterator:
+
+        # Only the two-hex-digit shard directories hold entries; anything else under cache_dir (such as the
+        # table manifests kept next to the object cache) is not ours to count or evict
+        for entry_dir in os.scandir(self.cache_dir):
+            if not (entry_dir.is_dir() and self._is_shard(entry_dir.name)):
+                continue
+            for entry in os.scandir(entry_dir.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    @staticmethod
+    def _is_shard(name: str) -> bool:
+
+        return len(name) == 2 and all(char in '0123456789abcdef' for char in name)
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+
+        return True
+
+
+class CachedBackend(StorageBackend):
+    """
+    Read-through wrapper: every get issues a HEAD to learn the current ETag and serves the payload from
+    the DiskCache when that exact version is already on disk.
+    """
+
+    def __init__(self,
+        backend: StorageBackend,
+        cache: DiskCache,
+        namespace: Optional[str] = None
+    ):
+
+        self.backend = backend
+        self.cache = cache
+        self.namespace = namespace or getattr(backend, 'namespace', type(backend).__name__)
+        self.multipart_threshold = backend.multipart_threshold
+        self.multipart_chunksize = backend.multipart_chunksize
+
+    def local_path(self,
+        key: str
+    ) -> str:
+
+        info = self.backend.head(key)
+        etag = info.etag or f'{info.last_modified}-{info.size}'
+
+        path = self.cache.lookup(self.namespace, key, etag)
+        if path is not None:
+            with self.cache._lock:
+                self.cache.stats.hits += 1
+                self.cache.stats.bytes_saved += info.size
+            return path
+
+        data = self.backend.get(key)
+        with self.cache._lock:
+            self.cache.stats.misses += 1
+            self.cache.stats.bytes_downloaded += len(data)
+
+        return self.cache.store(self.namespace, key, etag, data)
+
+    def _read(self,
+        key: str,
+        offset: int = 0,
+        length: int = -1
+    ) -> bytes:
+
+        # Another process may evict the file between lookup and open: that is a miss, so fetch it again
+        for attempt in range(2):
+            try:
+                with open(self.local_path(key), 'rb') as f:
+                    f.seek(offset)
+                    return f.read(length)
+            except FileNotFoundError:
+                if attempt:
+                    raise
+
+    def get(self,
+        key: str
+    ) -> bytes:
+
+        return self._read(key)
+
+    def get_range(self,
+        key: str,
+        offset: int,
+        length: int
+    ) -> bytes:
+
+        return self._read(key, offset, length)
+
+    def put(self,
+        key: str,
+        data: bytes
+    ) -> ObjectInfo:
+
+        self.cache.invalidate(self.namespace, key)
+        return self.backend.put(key, data)
+
+    def put_multipart(self,
+        key: str,
+        parts: Iterable[bytes]
+    ) -> ObjectInfo:
+
+        self.cache.invalidate(self.namespace, key)
+        return self.backend.put_multipart(key, parts)
+
+    def head(self,
+        key: str
+    ) -> ObjectInfo:
+
+        return self.backend.head(key)
+
+    def list(self,
+        prefix: str = ''
+    ) -> Iterator[ObjectInfo]:
+
+        return self.backend.list(prefix)
+
+    def list_delimited(self,
+        prefix: str = ''
+    ) -> Tuple[List[ObjectInfo], List[str]]:
+
+        return self.backend.list_delimited(prefix)
+
+    def delete(self,
+        key: str
+    ):
+
+        self.cache.invalidate(self.namespace, key)
+        self.backend.delete(key)
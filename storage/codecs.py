@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from io import BytesIO
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from ..lazy import lazy_import
+
+pd = lazy_import('pandas')
+pa = lazy_import('pyarrow')
+
+
+@dataclass(frozen=True)
+class ParquetOptions:
+    compression: Optional[str] = 'snappy'
+    compression_level: Optional[int] = None
+    row_group_size: Optional[int] = None        # rows per row group, None lets pyarrow decide
+    use_dictionary: bool = True
+
+
+@dataclass(frozen=True)
+class FeatherOptions:
+    compression: Optional[str] = 'lz4'          # 'uncompressed' keeps the file memory-mappable without copies
+    compression_level: Optional[int] = None
+    chunksize: Optional[int] = None             # rows per record batch
+
+
+# Pandas/pyarrow defaults are kept under 'default' so existing call sites do not change
+PARQUET_PRESETS: Dict[str, ParquetOptions] = {
+    'default': ParquetOptions(),
+    'fast-write': ParquetOptions(compression='snappy', use_dictionary=False),
+    'small-size': ParquetOptions(compression='zstd', compression_level=9, row_group_size=1_000_000),
+    'fast-scan': ParquetOptions(compression='lz4', row_group_size=128_000),
+}
+
+FEATHER_PRESETS: Dict[str, FeatherOptions] = {
+    'default': FeatherOptions(),
+    'fast-write': FeatherOptions(compression='uncompressed'),
+    'small-size': FeatherOptions(compression='zstd', compression_level=9),
+    'fast-scan': FeatherOptions(compression='uncompressed', chunksize=128_000),
+}
+
+
+def _resolve_options(presets, preset, overrides):
+
+    preset = preset or 'default'
+    if preset not in presets:
+        raise ValueError(f"Unknown preset '{preset}'. Choose one of {list(presets)}")
+
+    return replace(presets[preset], **{k: v for k, v in overrides.items() if v is not None})
+
+
+def resolve_parquet_options(
+    preset: Optional[str] = None,
+    **overrides
+) -> ParquetOptions:
+
+    return _resolve_options(PARQUET_PRESETS, preset, overrides)
+
+
+def resolve_feather_options(
+    preset: Optional[str] = None,
+    **overrides
+) -> FeatherOptions:
+
+    return _resolve_options(FEATHER_PRESETS, preset, overrides)
+
+
+def encode_parquet(
+    df: pd.DataFrame,
+    options: ParquetOptions = PARQUET_PRESETS['default']
+) -> bytes:
+
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with BytesIO() as f:
+        pq.write_table(
+            table,
+            f,
+            compression=options.compression or 'none',
+            compression_level=options.compression_level,
+            row_group_size=options.row_group_size,
+            use_dictionary=options.use_dictionary
+        )
+        data = f.getvalue()
+
+    return data
+
+
+def encode_feather(
+    df: pd.DataFrame,
+    options: FeatherOptions = FEATHER_PRESETS['default']
+) -> bytes:
+
+    import pyarrow.feather as feather
+
+    with BytesIO() as f:
+        feather.write_feather(
+            df,
+            f,
+            compression=options.compression or 'uncompressed',
+            compression_level=options.compression_level,
+            chunksize=options.chunksize
+        )
+        data = f.getvalue()
+
+    return data
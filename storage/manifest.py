@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .backends import StorageBackend, ObjectInfo
+
+
+def list_partitioned(
+    backend: StorageBackend,
+    prefix: str,
+    depth: int,
+    max_workers: int = 16
+) -> List[ObjectInfo]:
+    """
+    Lists every object under prefix, fanning out one thread per partition sub-prefix.
+    The first `depth` levels (one per partition column) are expanded with delimiter listings in parallel,
+    then each leaf partition is listed recursively in parallel.
+    """
+    objects: List[ObjectInfo] = []
+    frontier = [prefix]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in range(depth):
+            next_frontier = []
+            for level_objects, sub_prefixes in executor.map(backend.list_delimited, frontier):
+                objects.extend(level_objects)
+                next_frontier.extend(sub_prefixes)
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        for leaf_objects in executor.map(lambda leaf: list(backend.list(leaf)), frontier):
+            objects.extend(leaf_objects)
+
+    return sorted(objects, key=lambda info: info.key)
+
+
+@dataclass
+class ManifestStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class ManifestCache:
+    """
+    Caches object manifests (key, size, ETag) of table locations, tagged with a version such as the table's
+    last data modification time. A lookup with a different version is a miss, so a modified table is re-listed.
+    The in-memory layer is shared by every instance in the process; cache_dir adds a JSON layer shared across
+    processes on the host.
+    """
+
+    _memory: Dict[Hashable, Tuple[object, List[ObjectInfo]]] = {}
+    _memory_lock = threading.Lock()
+
+    def __init__(self,
+        cache_dir: Optional[str] = None
+    ):
+
+        self.cache_dir = cache_dir
+        self.stats = ManifestStats()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self,
+        key: Hashable
+    ) -> str:
+
+        return os.path.join(self.cache_dir, hashlib.sha256(repr(key).encode()).hexdigest() + '.json')
+
+    def get(self,
+        key: Hashable,
+        version: object
+    ) -> Optional[List[ObjectInfo]]:
+
+        entry = self._memory.get(key)
+        if entry is None and self.cache_dir is not None:
+            try:
+                with open(self._path(key)) as f:
+                    payload = json.load(f)
+                entry = (payload['version'], [ObjectInfo(**info) for info in payload['objects']])
+                with self._memory_lock:
+                    self._memory[key] = entry
+            except (FileNotFoundError, ValueError, KeyError):
+                entry = None
+
+        if entry is None or entry[0] != version:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return entry[1]
+
+    def put(self,
+        key: Hashable,
+        version: object,
+        objects: List[ObjectInfo]
+    ):
+
+        with self._memory_lock:
+            self._memory[key] = (version, objects)
+
+        if self.cache_dir is not None:
+            path = self._path(key)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': version, 'created_at': time.time(), 'objects': [asdict(info) for info in objects]}, f)
+            os.replace(tmp_path, path)
+
+    def invalidate(self,
+        key: Optional[Hashable] = None
+    ):
+
+        with self._memory_lock:
+            if key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(key, None)
+
+        if self.cache_dir is not None:
+            paths = [self._path(key)] if key is not None else [
+                os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -1,101 +1,258 @@
+from __future__ import annotations
+
 import os
-import oss2
-import pandas as pd
-from io import BytesIO
-from dotenv import load_dotenv
 from ..sql.odps import SimpleODPSClient
-from typing import List
-class SimpleOSSClient:
+from ..sql.partitions import partition_slug
+from .. import registry
+from ..lazy import lazy_import
+from typing import Iterable, Iterator, List, Tuple
+
+from .backends import StorageBackend, ObjectInfo, ObjectNotFound
+from .base import SimpleStorageClient
+from .manifest import ManifestCache, list_partitioned
+
+oss2 = lazy_import('oss2')
+pd = lazy_import('pandas')
+
+class OSSBackend(StorageBackend):
+    def __init__(self,
+        bucket: oss2.Bucket
+    ):
+
+        self.bucket = bucket
+        self.namespace = f'oss://{bucket.bucket_name}'
+
+    def get(self,
+        key: str
+    ) -> bytes:
+
+        try:
+            return self.bucket.get_object(key).read()
+        except oss2.exceptions.NoSuchKey as e:
+            raise ObjectNotFound(key) from e
+
+    def get_range(self,
+        key: str,
+        offset: int,
+        length: int
+    ) -> bytes:
+
+        # oss2 byte ranges are inclusive on both ends
+        try:
+            return self.bucket.get_object(key, byte_range=(offset, offset + length - 1)).read()
+        except oss2.exceptions.NoSuchKey as e:
+            raise ObjectNotFound(key) from e
+
+    def put(self,
+        key: str,
+        data: bytes
+    ) -> ObjectInfo:
+
+        result = self.bucket.put_object(key=key, data=data)
+
+        return ObjectInfo(key=key, size=len(data), etag=result.etag)
+
+    def put_multipart(self,
+        key: str,
+        parts: Iterable[bytes]
+    ) -> ObjectInfo:
+
+        upload_id = self.bucket.init_multipart_upload(key).upload_id
+        try:
+            part_list = []
+            size = 0
+            for part_number, part in enumerate(parts, start=1):
+                result = self.bucket.upload_part(key, upload_id, part_number, bytes(part))
+                part_list.append(oss2.models.PartInfo(part_number, result.etag))
+                size += len(part)
+
+            result = self.bucket.complete_multipart_upload(key, upload_id, part_list)
+        except BaseException:
+            self.bucket.abort_multipart_upload(key, upload_id)
+            raise
+
+        return ObjectInfo(key=key, size=size, etag=result.etag)
+
+    def head(self,
+        key: str
+    ) -> ObjectInfo:
+
+        try:
+            result = self.bucket.head_object(key)
+        except oss2.exceptions.NotFound as e:
+            raise ObjectNotFound(key) from e
+
+        return ObjectInfo(key=key, size=result.content_length, etag=result.etag, last_modified=result.last_modified)
+
+    def list(self,
+        prefix: str = ''
+    ) -> Iterator[ObjectInfo]:
+
+        for obj in oss2.ObjectIteratorV2(self.bucket, prefix=prefix):
+            yield ObjectInfo(key=obj.key, size=obj.size, etag=obj.etag, last_modified=obj.last_modified)
+
+    def list_delimited(self,
+        prefix: str = ''
+    ) -> Tuple[List[ObjectInfo], List[str]]:
+
+        objects, prefixes = [], []
+        for obj in oss2.ObjectIteratorV2(self.bucket, prefix=prefix, delimiter='/'):
+            if obj.is_prefix():
+                prefixes.append(obj.key)
+            else:
+                objects.append(ObjectInfo(key=obj.key, size=obj.size, etag=obj.etag, last_modified=obj.last_modified))
+
+        return objects, prefixes
+
+    def delete(self,
+        key: str
+    ):
+
+        self.bucket.delete_object(key)
+
+
+class SimpleOSSClient(SimpleStorageClient):
     def __init__(self,
         access_id_key: str = 'ODPS_ID',
         secret_access_key_key: str = 'ODPS_SECRET',
         endpoint: str = 'https://oss-ap-southeast-1.aliyuncs.com',
-        bucket_name: str = 'mynt-aa' 
+        bucket_name: str = 'mynt-aa',
+        cache_dir: str = None,
+        cache_max_bytes: int = 50 * 1024 ** 3,
+        pool_size: int = None
     ):
         
-        # Load Environment Variables
-        load_dotenv()
+        # Load Environment Variables (once per process)
+        registry.load_env()
         access_id = os.getenv(access_id_key)
         secret_access_key = os.getenv(secret_access_key_key)
         
-        auth = oss2.Auth(access_key_id=access_id, access_key_secret=secret_access_key)
-        bucket = oss2.Bucket(auth=auth, endpoint=endpoint, bucket_name=bucket_name)
-        o = SimpleODPSClient()
+        # Bucket and ODPS entry come from the process-wide registry, so construction is nearly free
+        bucket = registry.get_oss_bucket(
+            access_id=access_id,
+            secret_access_key=secret_access_key,
+            endpoint=endpoint,
+            bucket_name=bucket_name,
+            pool_size=pool_size
+        )
+        self.odps = SimpleODPSClient(access_id_key=access_id_key, secret_access_key_key=secret_access_key_key)
 
         self.bucket = bucket
-        self.o = o.o
+        self.endpoint = endpoint
 
-    def write_feather(self,
-        key: str,
-        df: pd.DataFrame
-    ):
-        
-        with BytesIO() as f:
-            df.to_feather(f)
-            data = f.getvalue()
-            
-        self.bucket.put_object(key=key, data=data)
-    
-    def read_feather(self,
-        key: str
-    ) -> pd.DataFrame:
-        
-        get_object_result = self.bucket.get_object(key)
-        result = get_object_result.read()
-        bytes_object = BytesIO(result)
-        df = pd.read_feather(bytes_object)
-        
-        return df
-        
-    def write_parquet(self,
-        key: str,
-        df: pd.DataFrame
+        super().__init__(backend=OSSBackend(bucket), cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+
+        # Table file manifests, persisted next to the object cache when there is one
+        self.manifests = ManifestCache(os.path.join(cache_dir, 'manifests') if cache_dir else None)
+
+    @property
+    def o(self):
+
+        return self.odps.o
+
+    def oss_location(self,
+        prefix: str
+    ) -> str:
+
+        # MaxCompute reads OSS through the internal endpoint of the same region
+        host = self.endpoint.split('://')[-1]
+        if '-internal' not in host:
+            host = host.replace('.aliyuncs.com', '-internal.aliyuncs.com')
+
+        return f"oss://{host}/{self.bucket.bucket_name}/{prefix.strip('/')}/"
+
+    def write_parquet_to_odps(self,
+        df: pd.DataFrame,
+        table_name: str,
+        prefix: str = None,
+        partitions: str = None,
+        overwrite: bool = True,
+        drop_external: bool = False,
+        **parquet_kwargs
     ):
-        
-        with BytesIO() as f:
-            df.to_parquet(f, index=False)
-            data = f.getvalue()
-            
-        self.bucket.put_object(key=key, data=data)
-        
-    def read_parquet(self,
-        key: str
-    ) -> pd.DataFrame:
-        
-        get_object_result = self.bucket.get_object(key)
-        result = get_object_result.read()
-        bytes_object = BytesIO(result)            
-        df = pd.read_parquet(bytes_object)
-        
-        return df
-    
-    def list_parquet_paths_from_odps(self,
+
+        # Upload once to OSS, then let MaxCompute copy it into the managed table server-side.
+        # Each partition stages under its own prefix so concurrent loads never delete each other's files.
+        prefix = (prefix or 'myntds/' + '_'.join(filter(None, [table_name, partition_slug(partitions), 'staging']))).strip('/')
+        if overwrite:
+            for key in self.list_keys(f'{prefix}/'):
+                self.backend.delete(key)
+        self.write_parquet(f'{prefix}/part-00000.parquet', df, **parquet_kwargs)
+
+        return self.odps.load_from_oss(
+            table_name=table_name,
+            oss_location=self.oss_location(prefix),
+            column_list=self.odps.column_list_from_df(df),
+            partitions=partitions,
+            overwrite=overwrite,
+            drop_external=drop_external
+        )
+
+    def list_parquet_objects_from_odps(self,
         project: str = 'mynt_ds_dev',
         table_name: str = None,
-        partitions: str = None
-    ) -> List[str]:
+        partitions: str = None,
+        max_workers: int = 16,
+        use_cache: bool = True
+    ) -> List[ObjectInfo]:
         
-        t = self.o.get_table(name=table_name, project=project)
+        # The manifest is keyed by the table's modification time, so that must be current, not cached
+        t = self.odps.metadata.get_table(table_name, project=project, refresh=use_cache)
         parts = [key for key in t.location.split("/")[4:] if len(key) > 0]
-        if partitions:
-            for partition in partitions.split(','):
-                parts.append(partition)
-        prefix = "/".join(parts)
-
-        paths = [
-            obj.key for obj in oss2.ObjectIteratorV2(self.bucket, prefix=prefix)
-            if not obj.key.endswith(".meta")
+        partition_specs = partitions.split(',') if partitions else []
+        for partition in partition_specs:
+            parts.append(partition)
+        prefix = "/".join(parts) + "/"
+
+        # Reuse the manifest until the table's data changes
+        cache_key = (self.backend.namespace, project, table_name, partitions)
+        version = t.last_data_modified_time.timestamp() if t.last_data_modified_time else None
+        if use_cache and version is not None:
+            objects = self.manifests.get(cache_key, version)
+            if objects is not None:
+                return objects
+
+        # Fan out over the remaining partition levels instead of paging through the whole prefix on one thread
+        depth = max(len(t.table_schema.partitions) - len(partition_specs), 0)
+        objects = [
+            info for info in list_partitioned(self.backend, prefix, depth=depth, max_workers=max_workers)
+            if not info.key.endswith(".meta")
         ]
 
+        if use_cache and version is not None:
+            self.manifests.put(cache_key, version, objects)
+
+        return objects
+
+    def list_parquet_paths_from_odps(self,
+        project: str = 'mynt_ds_dev',
+        table_name: str = None,
+        partitions: str = None,
+        max_workers: int = 16,
+        use_cache: bool = True
+    ) -> List[str]:
+
+        objects = self.list_parquet_objects_from_odps(
+            project=project,
+            table_name=table_name,
+            partitions=partitions,
+            max_workers=max_workers,
+            use_cache=use_cache
+        )
+        paths = [info.key for info in objects]
+
         return paths
 
     def read_parquet_from_odps(self,
         project: str = 'mynt_ds_dev',
         table_name: str = None,
-        partitions: str = None
+        partitions: str = None,
+        max_workers: int = 16,
+        split_bytes: int = 256 * 1024 ** 2,
+        progress: bool = True
     ) -> pd.DataFrame:
 
-        parquet_list = self.list_parquet_paths_from_odps(
+        parquet_list = self.list_parquet_objects_from_odps(
             table_name = table_name,
             partitions = partitions,
             project = project,
@@ -105,12 +262,13 @@ class SimpleOSSClient:
             print("Parquet Empty. Exiting now.")
             return 0
         
-        for i in range(len(parquet_list)):
-            parquet_path = parquet_list[i]
-            temp = self.read_parquet(parquet_path)
-            if i == 0:
-                df = temp
-            else:
-                df = pd.concat([df, temp])
+        # Sizes from the listing drive the schedule: big parts are split by row group and read largest-first
+        frames = self.read_parquet_many(
+            parquet_list,
+            max_workers=max_workers,
+            split_bytes=split_bytes,
+            progress=progress
+        )
+        df = pd.concat(frames)
 
         return df
\ No newline at end of file
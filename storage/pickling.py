@@ -0,0 +1,170 @@
+"""
+Framed pickle format used by SimpleStorageClient.write_pickle/read_pickle.
+
+    header  : magic, version, compression id, digest id, number of frames
+    digest  : sha256 or HMAC-SHA256 over everything after it (absent when digest id is 0)
+    lengths : one uint64 per frame
+    frames  : the protocol-5 pickle stream, then every out-of-band buffer (large numpy/pandas arrays)
+
+Out-of-band buffers are never copied into the pickle stream, and on load they are handed back to pickle as views
+over the downloaded payload.
+"""
+
+import os
+import hmac
+import lzma
+import zlib
+import pickle
+import struct
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MAGIC = b'MDPK'
+VERSION = 1
+HMAC_KEY_ENV = 'PICKLE_HMAC_KEY'
+
+_HEADER = struct.Struct('<4sBBBI')
+_DIGEST_SIZE = 32
+
+_DIGEST_IDS = {None: 0, 'sha256': 1, 'hmac': 2}
+
+
+class PickleIntegrityError(ValueError):
+    pass
+
+
+def _zstd() -> Tuple[Callable, Callable]:
+    import zstandard
+    return (
+        lambda data, level: zstandard.ZstdCompressor(level=level or 3).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+
+
+def _lz4() -> Tuple[Callable, Callable]:
+    import lz4.frame
+    return (
+        lambda data, level: lz4.frame.compress(data, compression_level=level or 0),
+        lambda data: lz4.frame.decompress(data)
+    )
+
+
+# id -> (name, factory returning (compress, decompress)); zstd and lz4 are optional dependencies
+_COMPRESSORS: Dict[int, Tuple[Optional[str], Callable]] = {
+    0: (None, lambda: (None, None)),
+    1: ('zlib', lambda: (lambda data, level: zlib.compress(data, 6 if level is None else level), zlib.decompress)),
+    2: ('lzma', lambda: (lambda data, level: lzma.compress(data, preset=6 if level is None else level), lzma.decompress)),
+    3: ('zstd', _zstd),
+    4: ('lz4', _lz4),
+}
+_COMPRESSION_IDS = {name: compression_id for compression_id, (name, _) in _COMPRESSORS.items()}
+
+
+def _resolve_hmac_key(hmac_key: Optional[bytes]) -> Optional[bytes]:
+
+    if hmac_key is None and os.getenv(HMAC_KEY_ENV):
+        hmac_key = os.getenv(HMAC_KEY_ENV)
+    if isinstance(hmac_key, str):
+        hmac_key = hmac_key.encode()
+
+    return hmac_key
+
+
+def _digest(digest_id: int, hmac_key: Optional[bytes], parts: List[Any]) -> bytes:
+
+    h = hmac.new(hmac_key, digestmod=hashlib.sha256) if digest_id == _DIGEST_IDS['hmac'] else hashlib.sha256()
+    for part in parts:
+        h.update(part)
+
+    return h.digest()
+
+
+def dumps(
+    obj: Any,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    checksum: bool = False,
+    hmac_key: Optional[bytes] = None
+) -> bytes:
+
+    if compression not in _COMPRESSION_IDS:
+        raise ValueError(f"Unknown compression '{compression}'. Choose one of {list(_COMPRESSION_IDS)}")
+    compression_id = _COMPRESSION_IDS[compression]
+    compress, _ = _COMPRESSORS[compression_id][1]()
+
+    hmac_key = _resolve_hmac_key(hmac_key)
+    if hmac_key is not None:
+        digest_id = _DIGEST_IDS['hmac']
+    else:
+        digest_id = _DIGEST_IDS['sha256'] if checksum else _DIGEST_IDS[None]
+
+    buffers = []
+    stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    frames = [stream] + [buffer.raw() for buffer in buffers]
+    if compress is not None:
+        frames = [compress(frame, compression_level) for frame in frames]
+
+    header = _HEADER.pack(MAGIC, VERSION, compression_id, digest_id, len(frames))
+    lengths = struct.pack(f'<{len(frames)}Q', *(frame.nbytes if isinstance(frame, memoryview) else len(frame) for frame in frames))
+
+    digest = b''
+    if digest_id != _DIGEST_IDS[None]:
+        digest = _digest(digest_id, hmac_key, [header, lengths, *frames])
+
+    return b''.join([header, digest, lengths, *frames])
+
+
+def loads(
+    payload: bytes,
+    hmac_key: Optional[bytes] = None,
+    writable: bool = True
+) -> Any:
+
+    hmac_key = _resolve_hmac_key(hmac_key)
+
+    # Objects written by the previous plain pickle.dump are still readable, but never when a signature is required
+    if payload[:len(MAGIC)] != MAGIC:
+        if hmac_key is not None:
+            raise PickleIntegrityError("Refusing to unpickle an unsigned legacy payload while an HMAC key is configured")
+        return pickle.loads(payload)
+
+    _, version, compression_id, digest_id, n_frames = _HEADER.unpack_from(payload, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported pickle frame version {version}")
+
+    # One copy into a bytearray keeps unpickled arrays writable, like the previous in-band format.
+    # Compressed frames are decompressed into fresh buffers anyway, so the payload itself is not copied.
+    copy_payload = writable and compression_id == _COMPRESSION_IDS[None]
+    view = memoryview(bytearray(payload) if copy_payload else payload)
+    offset = _HEADER.size
+
+    digest = b''
+    if digest_id != _DIGEST_IDS[None]:
+        digest = bytes(view[offset:offset + _DIGEST_SIZE])
+        offset += _DIGEST_SIZE
+
+    lengths_start = offset
+    lengths_end = lengths_start + 8 * n_frames
+    lengths = struct.unpack_from(f'<{n_frames}Q', view, lengths_start)
+
+    frames = []
+    offset = lengths_end
+    for length in lengths:
+        frames.append(view[offset:offset + length])
+        offset += length
+
+    # Verify before unpickling anything
+    if hmac_key is not None and digest_id != _DIGEST_IDS['hmac']:
+        raise PickleIntegrityError("Payload is not HMAC-signed but an HMAC key is configured")
+    if digest_id != _DIGEST_IDS[None]:
+        if digest_id == _DIGEST_IDS['hmac'] and hmac_key is None:
+            raise PickleIntegrityError(f"Payload is HMAC-signed; pass hmac_key or set {HMAC_KEY_ENV}")
+        expected = _digest(digest_id, hmac_key, [view[:_HEADER.size], view[lengths_start:lengths_end], *frames])
+        if not hmac.compare_digest(digest, expected):
+            raise PickleIntegrityError("Pickle payload failed integrity verification")
+
+    _, decompress = _COMPRESSORS[compression_id][1]()
+    if decompress is not None:
+        frames = [memoryview(bytearray(decompress(frame))) if writable else decompress(frame) for frame in frames]
+
+    return pickle.loads(frames[0], buffers=frames[1:])
@@ -1,87 +1,151 @@
-import os
-import boto3
-import pickle
-from typing import Any
+from typing import Any, Iterable, Iterator, List, Tuple
 
-from io import BytesIO
-from dotenv import load_dotenv
-import pandas as pd
+from .backends import StorageBackend, ObjectInfo, ObjectNotFound
+from .base import SimpleStorageClient
+from .. import registry
 
-class SimpleS3Client:
+class S3Backend(StorageBackend):
     def __init__(self,
-        bucket: str = 'myntanalytics'
+        client: Any,                # boto3 s3 client
+        bucket_name: str
     ):
-        
-        s3 = boto3.resource('s3')
-        self.bucket = s3.Bucket(bucket)
-    
-    def write_pickle(self,
-        key: str,
-        data: Any
-    ):
-        with BytesIO() as f:
-            pickle.dump(data, f)
-            payload = f.getvalue()
-            
-        bucket_obj = self.bucket.Object(key=key)
-        bucket_obj.put(Body=payload)
-        
-    def read_pickle(self,
+
+        self.bucket_name = bucket_name
+        self.namespace = f's3://{bucket_name}'
+        self.client = client
+
+    def _get_object(self, **kwargs):
+
+        try:
+            return self.client.get_object(Bucket=self.bucket_name, **kwargs)
+        except self.client.exceptions.NoSuchKey as e:
+            raise ObjectNotFound(kwargs['Key']) from e
+
+    def get(self,
         key: str
-    ) -> Any:
-        
-        bucket_obj = self.bucket.Object(key=key)
-        get_object_result = bucket_obj.get()['Body']
-        result = get_object_result.read()
-        bytes_object = BytesIO(result)
-        data = pickle.load(bytes_object)
-        
-        return data
-    
-    def write_feather(self,
+    ) -> bytes:
+
+        return self._get_object(Key=key)['Body'].read()
+
+    def get_range(self,
         key: str,
-        df: pd.DataFrame
-    ):
-        
-        with BytesIO() as f:
-            df.to_feather(f)
-            payload = f.getvalue()
-        
-        bucket_obj = self.bucket.Object(key=key)
-        bucket_obj.put(Body=payload)
-    
-    def read_feather(self,
-        key: str
-    ) -> pd.DataFrame:
-        
-        bucket_obj = self.bucket.Object(key=key)
-        get_object_result = bucket_obj.get()['Body']
-        result = get_object_result.read()
-        bytes_object = BytesIO(result)
-        df = pd.read_feather(bytes_object)
-        
-        return df
-        
-    def write_parquet(self,
+        offset: int,
+        length: int
+    ) -> bytes:
+
+        # HTTP ranges are inclusive on both ends
+        return self._get_object(Key=key, Range=f'bytes={offset}-{offset + length - 1}')['Body'].read()
+
+    def put(self,
         key: str,
-        df: pd.DataFrame
-    ):
-        
-        with BytesIO() as f:
-            df.to_parquet(f, index=False)
-            payload = f.getvalue()
-            
-        bucket_obj = self.bucket.Object(key=key)
-        bucket_obj.put(Body=payload)
-        
-    def read_parquet(self,
+        data: bytes
+    ) -> ObjectInfo:
+
+        result = self.client.put_object(Bucket=self.bucket_name, Key=key, Body=data)
+
+        return ObjectInfo(key=key, size=len(data), etag=result['ETag'].strip('"'))
+
+    def put_multipart(self,
+        key: str,
+        parts: Iterable[bytes]
+    ) -> ObjectInfo:
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket_name, Key=key)['UploadId']
+        try:
+            part_list = []
+            size = 0
+            for part_number, part in enumerate(parts, start=1):
+                result = self.client.upload_part(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id, PartNumber=part_number, Body=bytes(part))
+                part_list.append({'PartNumber': part_number, 'ETag': result['ETag']})
+                size += len(part)
+
+            result = self.client.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=key, UploadId=upload_id, MultipartUpload={'Parts': part_list})
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            raise
+
+        return ObjectInfo(key=key, size=size, etag=result['ETag'].strip('"'))
+
+    def head(self,
         key: str
-    ) -> pd.DataFrame:
-        
-        bucket_obj = self.bucket.Object(key=key)
-        get_object_result = bucket_obj.get()['Body']
-        result = get_object_result.read()
-        bytes_object = BytesIO(result)
-        df = pd.read_parquet(bytes_object)
-        
-        return df
\ No newline at end of file
+    ) -> ObjectInfo:
+
+        try:
+            result = self.client.head_object(Bucket=self.bucket_name, Key=key)
+        except self.client.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                raise ObjectNotFound(key) from e
+            raise
+
+        return ObjectInfo(
+            key=key,
+            size=result['ContentLength'],
+            etag=result['ETag'].strip('"'),
+            last_modified=result['LastModified'].timestamp()
+        )
+
+    def list(self,
+        prefix: str = ''
+    ) -> Iterator[ObjectInfo]:
+
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield ObjectInfo(
+                    key=obj['Key'],
+                    size=obj['Size'],
+                    etag=obj['ETag'].strip('"'),
+                    last_modified=obj['LastModified'].timestamp()
+                )
+
+    def list_delimited(self,
+        prefix: str = ''
+    ) -> Tuple[List[ObjectInfo], List[str]]:
+
+        objects, prefixes = [], []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, Delimiter='/'):
+            prefixes.extend(common_prefix['Prefix'] for common_prefix in page.get('CommonPrefixes', []))
+            for obj in page.get('Contents', []):
+                objects.append(ObjectInfo(
+                    key=obj['Key'],
+                    size=obj['Size'],
+                    etag=obj['ETag'].strip('"'),
+                    last_modified=obj['LastModified'].timestamp()
+                ))
+
+        return objects, prefixes
+
+    def delete(self,
+        key: str
+    ):
+
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
+
+
+class SimpleS3Client(SimpleStorageClient):
+    def __init__(self,
+        bucket: str = 'myntanalytics',
+        cache_dir: str = None,
+        cache_max_bytes: int = 50 * 1024 ** 3,
+        pool_size: int = None
+    ):
+
+        # The boto3 client is shared process-wide instead of being rebuilt per client
+        self.bucket_name = bucket
+        self._bucket = None
+        client = registry.get_s3_client(pool_size=pool_size)
+
+        super().__init__(backend=S3Backend(client, bucket), cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+
+    @property
+    def bucket(self) -> Any:
+
+        # boto3 resources are not thread-safe, so each SimpleS3Client builds its own, on first use
+        if self._bucket is None:
+            import boto3
+            self._bucket = boto3.resource('s3').Bucket(self.bucket_name)
+
+        return self._bucket
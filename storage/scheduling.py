@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from ..lazy import lazy_import
+from .backends import StorageBackend, ObjectInfo
+
+pd = lazy_import('pandas')
+
+
+class RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file over StorageBackend.get_range, so pyarrow can fetch a parquet footer and
+    individual row groups without downloading the whole object.
+    """
+
+    def __init__(self,
+        backend: StorageBackend,
+        key: str,
+        size: int
+    ):
+
+        self.backend = backend
+        self.key = key
+        self.size = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self,
+        offset: int,
+        whence: int = io.SEEK_SET
+    ) -> int:
+
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = self.size + offset
+
+        return self.position
+
+    def readinto(self,
+        buffer
+    ) -> int:
+
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+
+        data = self.backend.get_range(self.key, self.position, length)
+        buffer[:len(data)] = data
+        self.position += len(data)
+
+        return len(data)
+
+
+@dataclass
+class WorkUnit:
+    key: str
+    size: int                                   # bytes this unit downloads, used for ordering and progress
+    order: int                                  # position in the final concatenation
+    object_size: int = 0
+    row_groups: Optional[List[int]] = None      # None reads the whole object
+    metadata: Optional[object] = None           # parquet FileMetaData of split objects, read once
+
+
+def _split_object(
+    backend: StorageBackend,
+    info: ObjectInfo,
+    split_bytes: int
+) -> List[WorkUnit]:
+
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(RangeFile(backend, info.key, info.size)).metadata
+
+    # Greedily pack consecutive row groups into units of roughly split_bytes compressed bytes
+    units, row_groups, unit_size = [], [], 0
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        rg_size = sum(row_group.column(j).total_compressed_size for j in range(row_group.num_columns))
+        if row_groups and unit_size + rg_size > split_bytes:
+            units.append(WorkUnit(key=info.key, size=unit_size, order=0, object_size=info.size, row_groups=row_groups, metadata=metadata))
+            row_groups, unit_size = [], 0
+        row_groups.append(i)
+        unit_size += rg_size
+
+    if row_groups:
+        units.append(WorkUnit(key=info.key, size=unit_size, order=0, object_size=info.size, row_groups=row_groups, metadata=metadata))
+
+    return units
+
+
+def plan_parquet_reads(
+    backend: StorageBackend,
+    objects: List[ObjectInfo],
+    split_bytes: Optional[int] = 256 * 1024 ** 2,
+    max_workers: int = 16
+) -> List[WorkUnit]:
+    """
+    Turns a listing into work units ordered largest-first (LPT scheduling), splitting objects larger than
+    split_bytes by row group so that no single file becomes the straggler.
+    """
+    large = [info for info in objects if split_bytes is not None and info.size > split_bytes]
+
+    # Footers of large objects are fetched in parallel with two small range reads each
+    split_units = {}
+    if large:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for info, units in zip(large, executor.map(lambda info: _split_object(backend, info, split_bytes), large)):
+                split_units[info.key] = units
+
+    units = []
+    for info in objects:
+        units.extend(split_units.get(info.key) or [WorkUnit(key=info.key, size=info.size, order=0, object_size=info.size)])
+    for order, unit in enumerate(units):
+        unit.order = order
+
+    return sorted(units, key=lambda unit: unit.size, reverse=True)
+
+
+def _read_unit(
+    backend: StorageBackend,
+    unit: WorkUnit
+) -> pd.DataFrame:
+
+    import pyarrow.parquet as pq
+
+    if unit.row_groups is None:
+        return pd.read_parquet(io.BytesIO(backend.get(unit.key)))
+
+    # pre_buffer coalesces the column chunk reads of these row groups into a few range requests
+    source = RangeFile(backend, unit.key, unit.object_size)
+    parquet_file = pq.ParquetFile(source, metadata=unit.metadata, pre_buffer=True)
+
+    return parquet_file.read_row_groups(unit.row_groups).to_pandas()
+
+
+def read_parquet_units(
+    backend: StorageBackend,
+    units: List[WorkUnit],
+    max_workers: int = 16,
+    progress: bool = True,
+    desc: str = 'Reading parquet'
+) -> List[pd.DataFrame]:
+    """
+    Reads work units on a thread pool in the given (largest-first) order and returns the frames in their
+    original order. Progress is reported in bytes.
+    """
+    frames = [None] * len(units)
+
+    progress_bar = None
+    if progress:
+        from tqdm import tqdm
+        progress_bar = tqdm(total=sum(unit.size for unit in units), unit='B', unit_scale=True, unit_divisor=1024, desc=desc)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_unit = {executor.submit(_read_unit, backend, unit): unit for unit in units}
+            for future in as_completed(future_to_unit):
+                unit = future_to_unit[future]
+                frames[unit.order] = future.result()
+                if progress_bar is not None:
+                    progress_bar.update(unit.size)
+    finally:
+        if progress_bar is not None:
+            progress_bar.close()
+
+    return frames
@@ -0,0 +1,70 @@
+"""
+Background batch logging: close() stops the thread, partial batches are sent on time under steady load, and
+failures at interpreter exit are reported rather than raised.
+
+    python -m pytest tests/test_batching.py
+"""
+import os
+import sys
+import time
+import importlib
+
+import pytest
+
+pytest.importorskip('mlflow')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(REPO_ROOT)          # the repository directory is the package (myntds2)
+sys.path.insert(0, os.path.dirname(REPO_ROOT))
+
+batching = importlib.import_module(f'{PACKAGE_NAME}.tracking.batching')
+
+
+class RecordingClient:
+
+    def __init__(self,
+        fail: bool = False
+    ):
+        self.fail = fail
+        self.batches = []
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        if self.fail:
+            raise ConnectionError('server unavailable')
+        self.batches.append((run_id, len(metrics), time.monotonic()))
+
+
+def test_close_stops_thread():
+
+    client = RecordingClient()
+    logger = batching.BatchLogger(client, flush_interval=60)
+    logger.log_metric('run', 'loss', 0.5)
+    logger.close()
+
+    assert not logger._thread.is_alive()
+    assert [(run_id, count) for run_id, count, _ in client.batches] == [('run', 1)]
+
+
+def test_interval_flush_under_steady_load():
+
+    client = RecordingClient()
+    logger = batching.BatchLogger(client, flush_interval=0.1)
+    start = time.monotonic()
+    # Keep the queue busy for longer than the interval, far below a full batch
+    while time.monotonic() - start < 0.5:
+        logger.log_metric('run', 'loss', 0.5)
+        time.sleep(0.001)
+    sent_while_busy = len(client.batches)
+    logger.close()
+
+    assert sent_while_busy >= 2
+
+
+def test_errors_at_exit_are_reported(capsys):
+
+    logger = batching.BatchLogger(RecordingClient(fail=True), flush_interval=60)
+    logger.log_param('run', 'lr', 0.1)
+    logger._close_at_exit()
+
+    assert not logger._thread.is_alive()
+    assert 'failed' in capsys.readouterr().out
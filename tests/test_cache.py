@@ -0,0 +1,38 @@
+"""
+Local object cache: eviction must only ever touch cached payloads, never the table manifests kept next to them.
+
+    python -m pytest tests/test_cache.py
+"""
+import os
+import sys
+import importlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(REPO_ROOT)          # the repository directory is the package (myntds2)
+sys.path.insert(0, os.path.dirname(REPO_ROOT))
+
+cache = importlib.import_module(f'{PACKAGE_NAME}.storage.cache')
+manifest = importlib.import_module(f'{PACKAGE_NAME}.storage.manifest')
+backends = importlib.import_module(f'{PACKAGE_NAME}.storage.backends')
+
+
+def test_eviction_keeps_manifests(tmp_path):
+
+    # Same layout as OSSStorage: manifests live in a subdirectory of the object cache
+    disk_cache = cache.DiskCache(str(tmp_path), max_bytes=3000)
+    manifests = manifest.ManifestCache(str(tmp_path / 'manifests'))
+    objects = [backends.ObjectInfo(key=f'table/part-{index}.parquet', size=1000, etag=str(index)) for index in range(50)]
+    manifests.put(('bucket', 'table'), 1, objects)
+    manifest_path = manifests._path(('bucket', 'table'))
+    assert os.path.getsize(manifest_path) > 1000
+
+    for index in range(5):
+        disk_cache.store('bucket', f'object-{index}', 'etag', b'\0' * 1000)
+
+    assert os.path.exists(manifest_path)
+    assert disk_cache.stats.evictions == 2
+    assert disk_cache.size() == 3000
+
+    disk_cache.clear()
+    assert disk_cache.size() == 0
+    assert os.path.exists(manifest_path)
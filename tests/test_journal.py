@@ -0,0 +1,143 @@
+"""
+Offline tracking end to end: track into a journal with no server, then sync it into a local MLflow file store.
+
+    python -m pytest tests/test_journal.py
+"""
+import os
+import sys
+import importlib
+
+import pytest
+
+pytest.importorskip('mlflow')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(REPO_ROOT)          # the repository directory is the package (myntds2)
+sys.path.insert(0, os.path.dirname(REPO_ROOT))
+
+mlflow2 = importlib.import_module(f'{PACKAGE_NAME}.tracking.mlflow2')
+journal = importlib.import_module(f'{PACKAGE_NAME}.tracking.journal')
+
+
+@pytest.fixture
+def wrapper(tmp_path, monkeypatch):
+
+    # The wrapper points MLFLOW_TRACKING_* at the team server; keep that out of the environment of other tests
+    for name in ('MLFLOW_TRACKING_URI', 'MLFLOW_TRACKING_USERNAME', 'MLFLOW_TRACKING_PASSWORD'):
+        monkeypatch.setenv(name, '')
+    monkeypatch.setenv('MLFLOW_ALLOW_FILE_STORE', 'true')
+
+    return mlflow2.MLFlowClientWrapper(journal_path=str(tmp_path / 'journal.db'))
+
+
+@pytest.fixture
+def tracking_uri(tmp_path):
+
+    return (tmp_path / 'mlruns').as_uri()
+
+
+def _track(wrapper, tmp_path):
+
+    wrapper.create_experiment('offline')
+    wrapper.create_run('run-1')
+    wrapper.set_run('run-1')
+    wrapper.log_params({'lr': 0.1, 'depth': 6})
+    wrapper.log_metrics({'auc': 0.8, 'val/loss': 0.3})
+    wrapper.log_historical_metric('train_loss', [1.0 / step for step in range(1, 2501)])
+    wrapper.set_tags({'stage': 'test'})
+
+    model_dir = tmp_path / 'model'
+    (model_dir / 'data').mkdir(parents=True)
+    (model_dir / 'MLmodel').write_text('flavors: {}\n')
+    (model_dir / 'data' / 'weights.bin').write_bytes(b'\0' * 64)
+    wrapper.log_artifacts(str(model_dir), 'models')
+
+
+def test_offline_artifact_listing(wrapper, tmp_path):
+
+    _track(wrapper, tmp_path)
+
+    listing = {info.path: info.is_dir for info in wrapper.client.list_artifacts(wrapper.run_id, 'models')}
+    assert listing == {'models/MLmodel': False, 'models/data': True}
+    assert wrapper.artifact_index.exists(wrapper.run_id, 'models/data/weights.bin')
+    assert not wrapper.artifact_index.exists(wrapper.run_id, 'models/missing')
+
+
+def test_offline_registry_calls_fail_clearly(wrapper, tmp_path):
+
+    _track(wrapper, tmp_path)
+
+    with pytest.raises(ValueError, match='offline mode'):
+        wrapper.register_model('models', 'some-model')
+    with pytest.raises(ValueError, match='offline mode'):
+        wrapper.load_model_from_run_artifacts('models')
+
+
+def test_sync_and_resync(wrapper, tmp_path, tracking_uri):
+
+    from mlflow.tracking import MlflowClient
+
+    _track(wrapper, tmp_path)
+    local_run_id = wrapper.run_id
+
+    assert wrapper.sync_journal(tracking_uri) == wrapper.journal.counts()['total']
+    assert wrapper.journal.counts()['pending'] == 0
+
+    # Everything was already applied: a second sync sends nothing
+    assert wrapper.sync_journal(tracking_uri) == 0
+
+    client = MlflowClient(tracking_uri)
+    experiment = client.get_experiment_by_name('offline')
+    runs = client.search_runs([experiment.experiment_id])
+    assert len(runs) == 1
+
+    run = runs[0]
+    assert run.data.tags[journal.LOCAL_RUN_ID_TAG] == local_run_id
+    assert run.data.tags['mlflow.runName'] == 'run-1'
+    assert run.data.params == {'lr': '0.1', 'depth': '6'}
+    assert run.data.metrics['auc'] == 0.8
+    assert len(client.get_metric_history(run.info.run_id, 'train_loss')) == 2500
+    assert {info.path for info in client.list_artifacts(run.info.run_id, 'models')} == {'models/MLmodel', 'models/data'}
+
+
+def test_interrupted_sync_resumes_without_duplicates(wrapper, tmp_path, tracking_uri):
+
+    from mlflow.tracking import MlflowClient
+
+    _track(wrapper, tmp_path)
+
+    # Crash right after the run was created on the server, before its id was recorded in the journal
+    class CrashingClient(MlflowClient):
+        def create_run(self, *args, **kwargs):
+            super().create_run(*args, **kwargs)
+            raise ConnectionError('connection lost')
+
+    with pytest.raises(ConnectionError):
+        journal.JournalSyncer(wrapper.journal, CrashingClient(tracking_uri)).sync()
+    assert wrapper.journal.counts()['pending'] > 0
+
+    wrapper.sync_journal(tracking_uri)
+    assert wrapper.journal.counts()['pending'] == 0
+
+    client = MlflowClient(tracking_uri)
+    experiment = client.get_experiment_by_name('offline')
+    runs = client.search_runs([experiment.experiment_id])
+    assert len(runs) == 1
+    assert len(client.get_metric_history(runs[0].info.run_id, 'train_loss')) == 2500
+
+
+def test_offline_search_runs(wrapper, tmp_path):
+
+    _track(wrapper, tmp_path)
+    wrapper.create_run('run-2')
+
+    client = wrapper.client
+    experiment_id = client.get_experiment_by_name('offline').experiment_id
+    runs = {run.info.run_name: run for run in client.search_runs([experiment_id])}
+    assert set(runs) == {'run-1', 'run-2'}
+    assert runs['run-1'].data.params == {'lr': '0.1', 'depth': '6'}
+    assert runs['run-1'].data.metrics['train_loss'] == 1.0 / 2500
+    assert runs['run-2'].data.metrics == {}
+
+    runs = client.search_runs([experiment_id], filter_string="tags.`mlflow.runName` = 'run-2'")
+    assert [run.info.run_name for run in runs] == ['run-2']
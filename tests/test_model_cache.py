@@ -0,0 +1,56 @@
+"""
+Registry model cache: failed loads leave no state behind and the shared download directory stays bounded.
+
+    python -m pytest tests/test_model_cache.py
+"""
+import os
+import sys
+import importlib
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(REPO_ROOT)          # the repository directory is the package (myntds2)
+sys.path.insert(0, os.path.dirname(REPO_ROOT))
+
+model_cache = importlib.import_module(f'{PACKAGE_NAME}.tracking.model_cache')
+
+
+def _write_version(download_dir, name, version, size, mtime):
+
+    path = download_dir / 'digest' / name / str(version)
+    path.mkdir(parents=True)
+    (path / 'model.bin').write_bytes(b'\0' * size)
+    os.utime(path, (mtime, mtime))
+
+    return str(path)
+
+
+def test_failed_load_releases_key(tmp_path, monkeypatch):
+
+    cache = model_cache.ModelCache(download_dir=str(tmp_path))
+    monkeypatch.setattr(cache, 'local_path', lambda client, name, version: str(tmp_path))
+
+    def failing_load(path):
+        raise OSError('corrupt model')
+
+    for _ in range(3):
+        with pytest.raises(OSError):
+            cache.get_or_load(None, 'model', '1', 'pyfunc', failing_load)
+    assert cache._loading == {}
+
+    assert cache.get_or_load(None, 'model', '1', 'pyfunc', lambda path: 'loaded') == 'loaded'
+    assert cache._loading == {}
+
+
+def test_download_eviction_keeps_recent_versions(tmp_path):
+
+    cache = model_cache.ModelCache(download_dir=str(tmp_path), max_download_bytes=2500)
+    oldest = _write_version(tmp_path, 'model', 1, 1000, mtime=1)
+    older = _write_version(tmp_path, 'model', 2, 1000, mtime=2)
+    recent = _write_version(tmp_path, 'other', 1, 1000, mtime=3)
+    newest = _write_version(tmp_path, 'model', 3, 1000, mtime=0)     # just downloaded, oldest mtime on purpose
+
+    cache._evict_downloads(keep=newest)
+
+    assert [os.path.isdir(path) for path in (oldest, older, recent, newest)] == [False, False, True, True]
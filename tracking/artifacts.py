@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mlflow.tracking import MlflowClient
+
+
+class ArtifactIndex:
+    """
+    Per-run, per-directory sets of artifact paths. Each directory costs one list_artifacts call, after which
+    writes made through this process keep it current, so existence checks are usually free.
+    """
+
+    def __init__(self,
+        client: MlflowClient
+    ):
+
+        self.client = client
+        self._paths: Dict[Tuple[str, str], Set[str]] = {}       # {(run_id, directory): {full artifact paths}}
+        self._lock = threading.Lock()
+
+    def paths(self,
+        run_id: str,
+        directory: str = '',
+        refresh: bool = False
+    ) -> Set[str]:
+
+        key = (run_id, directory)
+        if refresh or key not in self._paths:
+            paths = {file_info.path for file_info in self.client.list_artifacts(run_id, directory or None)}
+            with self._lock:
+                self._paths[key] = paths
+
+        return self._paths[key]
+
+    def exists(self,
+        run_id: str,
+        artifact_path: str,
+        confirm_miss: bool = False
+    ) -> bool:
+
+        # confirm_miss re-lists once before answering False, for callers that need the path to be there
+        # and another process may have written it since the index was filled
+        artifact_path = artifact_path.strip('/')
+        directory = posixpath.dirname(artifact_path)
+        if artifact_path in self.paths(run_id, directory):
+            return True
+
+        return confirm_miss and artifact_path in self.paths(run_id, directory, refresh=True)
+
+    def add(self,
+        run_id: str,
+        artifact_path: str
+    ):
+
+        # 'models/a/MLmodel' also makes 'models' and 'models/a' known in their parent directories
+        parts = artifact_path.strip('/').split('/')
+        with self._lock:
+            for i in range(1, len(parts) + 1):
+                key = (run_id, '/'.join(parts[:i - 1]))
+                if key in self._paths:
+                    self._paths[key].add('/'.join(parts[:i]))
+
+    def invalidate(self,
+        run_id: Optional[str] = None
+    ):
+
+        with self._lock:
+            for key in list(self._paths):
+                if run_id is None or key[0] == run_id:
+                    del self._paths[key]
+
+
+def _directory_files(
+    local_dir: str,
+    artifact_path: Optional[str]
+) -> List[Tuple[str, Optional[str], int]]:
+
+    files = []
+    for root, _, names in os.walk(local_dir):
+        relative_dir = os.path.relpath(root, local_dir)
+        target_dir = artifact_path if relative_dir == '.' else '/'.join(filter(None, [artifact_path, relative_dir.replace(os.sep, '/')]))
+        for name in names:
+            path = os.path.join(root, name)
+            files.append((path, target_dir or None, os.path.getsize(path)))
+
+    return files
+
+
+def upload_directory(
+    client: MlflowClient,
+    run_id: str,
+    local_dir: str,
+    artifact_path: Optional[str] = None,
+    max_workers: int = 8,
+    progress: bool = True,
+    desc: str = 'Uploading artifacts'
+) -> int:
+    """
+    Equivalent of client.log_artifacts(run_id, local_dir, artifact_path) with files uploaded on a thread pool,
+    largest first, and progress reported in bytes. Returns the number of files uploaded.
+    """
+    files = sorted(_directory_files(local_dir, artifact_path), key=lambda file: file[2], reverse=True)
+
+    progress_bar = None
+    if progress:
+        from tqdm import tqdm
+        progress_bar = tqdm(total=sum(size for _, _, size in files), unit='B', unit_scale=True, unit_divisor=1024, desc=desc)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_size = {executor.submit(client.log_artifact, run_id, path, target_dir): size for path, target_dir, size in files}
+            for future in as_completed(future_to_size):
+                future.result()
+                if progress_bar is not None:
+                    progress_bar.update(future_to_size[future])
+    finally:
+        if progress_bar is not None:
+            progress_bar.close()
+
+    return len(files)
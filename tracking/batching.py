@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import time
+import queue
+import atexit
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .utils import get_current_time_millis
+
+if TYPE_CHECKING:
+    from mlflow.tracking import MlflowClient
+    from mlflow.entities import Metric, Param, RunTag
+
+# Server-side limits of a single log_batch request
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+MAX_ENTITIES_PER_BATCH = 1000
+
+# Queue sentinel that makes the background thread send what it holds and exit
+_CLOSE = object()
+
+
+def iter_log_batches(
+    metrics: Sequence[Metric] = (),
+    params: Sequence[Param] = (),
+    tags: Sequence[RunTag] = ()
+) -> Iterator[Tuple[List[Metric], List[Param], List[RunTag]]]:
+    """
+    Splits entities into (metrics, params, tags) chunks that each fit in one log_batch request.
+    """
+    metrics, params, tags = list(metrics), list(params), list(tags)
+
+    # Offsets instead of re-slicing the remainder, which would be quadratic for long curves
+    i_metric = i_param = i_tag = 0
+    while i_metric < len(metrics) or i_param < len(params) or i_tag < len(tags):
+        batch_params = params[i_param:i_param + MAX_PARAMS_PER_BATCH]
+        batch_tags = tags[i_tag:i_tag + MAX_TAGS_PER_BATCH]
+        room = min(MAX_METRICS_PER_BATCH, MAX_ENTITIES_PER_BATCH - len(batch_params) - len(batch_tags))
+        batch_metrics = metrics[i_metric:i_metric + room]
+        i_metric, i_param, i_tag = i_metric + len(batch_metrics), i_param + len(batch_params), i_tag + len(batch_tags)
+        yield batch_metrics, batch_params, batch_tags
+
+
+def log_batch_chunked(
+    client: MlflowClient,
+    run_id: str,
+    metrics: Sequence[Metric] = (),
+    params: Sequence[Param] = (),
+    tags: Sequence[RunTag] = ()
+) -> int:
+
+    requests = 0
+    for batch_metrics, batch_params, batch_tags in iter_log_batches(metrics, params, tags):
+        client.log_batch(run_id=run_id, metrics=batch_metrics, params=batch_params, tags=batch_tags)
+        requests += 1
+
+    return requests
+
+
+def _is_default_index(
+    index: Any
+) -> bool:
+
+    return getattr(index, 'start', None) == 0 and getattr(index, 'step', None) == 1
+
+
+def curve_arrays(
+    values: Any,
+    steps: Optional[Sequence[int]] = None,
+    timestamps: Optional[Sequence[int]] = None
+) -> Tuple[Any, Any, Optional[Any]]:
+    """
+    Normalizes one metric curve to (values, steps, timestamps) numpy arrays. Accepts a sequence or array
+    (steps default to 1..n), a Series (an explicit integer index is used as steps; the default RangeIndex
+    counts 1..n like a list) or a DataFrame with 'value' and optional 'step' / 'timestamp' columns.
+    """
+    import numpy as np
+
+    if hasattr(values, 'columns'):
+        frame = values
+        values = frame['value']
+        if steps is None and 'step' in frame.columns:
+            steps = frame['step'].to_numpy()
+        if timestamps is None and 'timestamp' in frame.columns:
+            timestamps = frame['timestamp'].to_numpy()
+    # list.index is a method, so look for an index with a dtype; a default 0..n-1 index carries no steps
+    index = getattr(values, 'index', None)
+    if steps is None and hasattr(index, 'dtype') and np.issubdtype(index.dtype, np.integer) and not _is_default_index(index):
+        steps = index.to_numpy()
+
+    values = np.asarray(values, dtype='float64').ravel()
+    steps = np.arange(1, len(values) + 1) if steps is None else np.asarray(steps, dtype='int64').ravel()
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps)
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            timestamps = timestamps.astype('datetime64[ms]')
+        timestamps = timestamps.astype('int64').ravel()
+
+    if len(steps) != len(values) or (timestamps is not None and len(timestamps) != len(values)):
+        raise ValueError(f"values ({len(values)}), steps ({len(steps)}) and timestamps must have the same length")
+
+    return values, steps, timestamps
+
+
+def curve_metrics(
+    key: str,
+    values: Any,
+    steps: Any,
+    timestamps: Optional[Any] = None,
+    base_timestamp: Optional[int] = None
+) -> List[Metric]:
+
+    from mlflow.entities import Metric
+
+    # Without explicit timestamps, steps are spread 1 ms apart so the curve keeps its order in the UI
+    if timestamps is None:
+        timestamps = (base_timestamp or get_current_time_millis()) + steps
+
+    return [
+        Metric(key, value, timestamp, step)
+        for value, timestamp, step in zip(values.tolist(), timestamps.tolist(), steps.tolist())
+    ]
+
+
+def log_batch_concurrent(
+    client: MlflowClient,
+    run_id: str,
+    metrics: Sequence[Metric] = (),
+    params: Sequence[Param] = (),
+    tags: Sequence[RunTag] = (),
+    max_workers: int = 8
+) -> int:
+    """
+    log_batch_chunked with the chunks sent on a thread pool. Only for entities whose order does not
+    matter, e.g. metrics that carry explicit steps and timestamps.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    batches = list(iter_log_batches(metrics, params, tags))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(client.log_batch, run_id=run_id, metrics=batch_metrics, params=batch_params, tags=batch_tags)
+            for batch_metrics, batch_params, batch_tags in batches
+        ]
+        for future in futures:
+            future.result()
+
+    return len(batches)
+
+
+class _PendingRun:
+
+    def __init__(self):
+
+        self.metrics: List[Metric] = []
+        self.params: Dict[str, Param] = {}          # a batch may not repeat a key; the last value wins
+        self.tags: Dict[str, RunTag] = {}
+        self.items = 0                              # queue items covered, for task_done()
+
+    def full(self) -> bool:
+        return (
+            len(self.metrics) >= MAX_METRICS_PER_BATCH
+            or len(self.params) >= MAX_PARAMS_PER_BATCH
+            or len(self.tags) >= MAX_TAGS_PER_BATCH
+        )
+
+
+class BatchLogger:
+    """
+    Background thread that coalesces metrics, params and tags into log_batch requests. The caller only
+    pays a queue put; a run's batch is sent when it reaches a per-batch limit, when flush_interval seconds
+    have passed, on flush(), and at interpreter exit.
+    """
+
+    def __init__(self,
+        client: MlflowClient,
+        flush_interval: float = 2.0,
+        max_queue_size: int = 1_000_000
+    ):
+
+        self.client = client
+        self.flush_interval = flush_interval
+        self.errors: List[Exception] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name='mlflow-batch-logger', daemon=True)
+        self._thread.start()
+        atexit.register(self._close_at_exit)
+
+    #############################################################################################################
+    #
+    #                                                 Enqueue
+    #
+    #############################################################################################################
+
+    def log_metric(self,
+        run_id: str,
+        key: str,
+        value: float,
+        step: Optional[int] = None,
+        timestamp: Optional[int] = None
+    ):
+        from mlflow.entities import Metric
+
+        # Timestamp is taken now, not when the batch is sent
+        metric = Metric(key=key, value=value, timestamp=timestamp or get_current_time_millis(), step=step or 0)
+        self._put(run_id, 'metric', metric)
+
+    def log_param(self,
+        run_id: str,
+        key: str,
+        value: Any
+    ):
+        from mlflow.entities import Param
+
+        self._put(run_id, 'param', Param(key, str(value)))
+
+    def set_tag(self,
+        run_id: str,
+        key: str,
+        value: Any
+    ):
+        from mlflow.entities import RunTag
+
+        self._put(run_id, 'tag', RunTag(key, str(value)))
+
+    def _put(self,
+        run_id: str,
+        kind: str,
+        entity: Any
+    ):
+        if self._closed:
+            raise RuntimeError('BatchLogger is closed')
+        self._queue.put((run_id, kind, entity))
+
+    #############################################################################################################
+    #
+    #                                                 Flushing
+    #
+    #############################################################################################################
+
+    def flush(self):
+        """
+        Blocks until everything enqueued so far has been sent. Raises the first error seen by the
+        background thread since the previous flush.
+        """
+        self._queue.put(None)               # wakes the worker so pending batches are sent immediately
+        self._queue.join()
+        self._raise_errors()
+
+    def close(self):
+        """
+        Sends everything still queued and stops accepting entities. Like flush(), raises the first error
+        seen by the background thread, so metrics lost at shutdown do not go unnoticed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        atexit.unregister(self._close_at_exit)
+        self._raise_errors()
+
+    def _close_at_exit(self):
+
+        # A traceback during interpreter shutdown helps nobody; report the failure instead
+        try:
+            self.close()
+        except RuntimeError as e:
+            print(f'MLflow batch logging at exit: {e}')
+
+    def _raise_errors(self):
+
+        if self.errors:
+            errors, self.errors = self.errors, []
+            raise RuntimeError(f'{len(errors)} MLflow log_batch requests failed; first error: {errors[0]}') from errors[0]
+
+    def _send(self,
+        run_id: str,
+        pending: _PendingRun
+    ):
+        try:
+            log_batch_chunked(self.client, run_id, pending.metrics, list(pending.params.values()), list(pending.tags.values()))
+        except Exception as e:
+            print(f'MLflow batch logging for run {run_id} failed: {e}')
+            self.errors.append(e)
+        finally:
+            for _ in range(pending.items):
+                self._queue.task_done()
+
+    def _send_all(self,
+        pending: Dict[str, _PendingRun]
+    ):
+        for run_id, run_pending in pending.items():
+            self._send(run_id, run_pending)
+        pending.clear()
+
+    def _run(self):
+
+        pending: Dict[str, _PendingRun] = {}
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                item = ...                  # interval elapsed
+
+            if item is None or item is ... or item is _CLOSE:
+                self._send_all(pending)
+                deadline = time.monotonic() + self.flush_interval
+                if item is not ...:
+                    self._queue.task_done()
+                if item is _CLOSE:
+                    break
+                continue
+
+            run_id, kind, entity = item
+            run_pending = pending.setdefault(run_id, _PendingRun())
+            if kind == 'metric':
+                run_pending.metrics.append(entity)
+            elif kind == 'param':
+                run_pending.params[entity.key] = entity
+            else:
+                run_pending.tags[entity.key] = entity
+            run_pending.items += 1
+
+            if run_pending.full():
+                self._send(run_id, pending.pop(run_id))
+
+            # A queue that never drains would otherwise hold partial batches until they fill up
+            if time.monotonic() >= deadline:
+                self._send_all(pending)
+                deadline = time.monotonic() + self.flush_interval
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mlflow.tracking import MlflowClient
+
+# {(tracking uri, experiment name): experiment_id}, shared by every wrapper in the process
+_experiment_ids: Dict[Tuple[str, str], str] = {}
+_lock = threading.Lock()
+
+
+def _tracking_key(
+    client: MlflowClient
+) -> str:
+
+    tracking_client = getattr(client, '_tracking_client', None)
+    return getattr(tracking_client, 'tracking_uri', None) or getattr(client, 'tracking_uri', None) or str(id(client))
+
+
+def _is_active(
+    client: MlflowClient,
+    experiment_id: str,
+    experiment_name: str
+) -> bool:
+
+    from mlflow.exceptions import MlflowException
+
+    try:
+        experiment = client.get_experiment(experiment_id)
+    except MlflowException as e:
+        if e.error_code != 'RESOURCE_DOES_NOT_EXIST':
+            raise
+        return False
+
+    return experiment.lifecycle_stage == 'active' and experiment.name == experiment_name
+
+
+def get_experiment_id(
+    client: MlflowClient,
+    experiment_name: str,
+    validate: bool = False
+) -> Optional[str]:
+    """
+    Id of the active experiment with this name, or None. Deleted experiments count as missing, like in
+    search_experiments(). One get_experiment_by_name call the first time; afterwards the cached id is
+    returned as is, or with validate=True after one get_experiment call confirming it is still active
+    under this name. Callers whose requests fail against a cached id should forget_experiment_id() it.
+    """
+    key = (_tracking_key(client), experiment_name)
+    experiment_id = _experiment_ids.get(key)
+    if experiment_id is not None:
+        if not validate or _is_active(client, experiment_id, experiment_name):
+            return experiment_id
+        forget_experiment_id(client, experiment_name)
+
+    experiment = client.get_experiment_by_name(experiment_name)
+    if experiment is None or experiment.lifecycle_stage != 'active':
+        return None
+
+    with _lock:
+        _experiment_ids[key] = experiment.experiment_id
+
+    return experiment.experiment_id
+
+
+def forget_experiment_id(
+    client: MlflowClient,
+    experiment_name: str
+):
+
+    with _lock:
+        _experiment_ids.pop((_tracking_key(client), experiment_name), None)
+
+
+def create_experiment_id(
+    client: MlflowClient,
+    experiment_name: str
+) -> Tuple[str, bool]:
+    """
+    Creates the experiment and returns (experiment_id, created). When a concurrent job created it first,
+    the server answers RESOURCE_ALREADY_EXISTS and the existing id is returned with created=False.
+    """
+    from mlflow.exceptions import MlflowException
+
+    try:
+        experiment_id = client.create_experiment(experiment_name)
+        created = True
+    except MlflowException as e:
+        if e.error_code != 'RESOURCE_ALREADY_EXISTS':
+            raise
+        experiment_id = get_experiment_id(client, experiment_name)
+        if experiment_id is None:
+            raise ValueError(f"Experiment '{experiment_name}' exists but is deleted. Restore it or use a different name.") from e
+        created = False
+
+    with _lock:
+        _experiment_ids[(_tracking_key(client), experiment_name)] = experiment_id
+
+    return experiment_id, created
+
@@ -0,0 +1,665 @@
+"""
+Local-first MLflow tracking: every experiment, run, param, metric, tag and artifact operation is appended to
+a SQLite journal (one local transaction, no network) and pushed to a tracking server later, in batches, by
+JournalSyncer. Sync is resumable: operations are marked synced as they are applied and local ids are mapped
+to server ids in the journal itself, so a crashed sync picks up where it stopped.
+
+    python -m myntds2.tracking.journal sync --journal runs.db --tracking-uri https://mlflow.example.com
+    python -m myntds2.tracking.journal status --journal runs.db
+"""
+from __future__ import annotations
+
+import os
+import re
+import posixpath
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import argparse
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from .utils import get_current_time_millis
+
+if TYPE_CHECKING:
+    from mlflow.tracking import MlflowClient
+
+# Tag that links a server run to the journal run it was created from, so a resumed sync never duplicates it
+LOCAL_RUN_ID_TAG = 'myntds.local_run_id'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS ops (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    run_id TEXT,
+    payload TEXT NOT NULL,
+    synced INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ops_pending ON ops (synced, seq);
+CREATE INDEX IF NOT EXISTS ops_run ON ops (run_id, seq);
+CREATE INDEX IF NOT EXISTS ops_op ON ops (op, seq);
+CREATE TABLE IF NOT EXISTS ids (
+    local_id TEXT PRIMARY KEY,
+    remote_id TEXT NOT NULL
+);
+'''
+
+_RUN_NAME_FILTER = re.compile(r'''mlflow\.runName`?\s*(=|LIKE)\s*(?:'([^']*)'|"([^"]*)")''', re.IGNORECASE)
+
+
+class TrackingJournal:
+    """
+    Append-only operation log in SQLite (WAL mode). Artifacts are copied next to the database so they
+    survive until synced.
+    """
+
+    def __init__(self,
+        path: str
+    ):
+
+        self.path = os.path.abspath(path)
+        self.artifact_dir = f'{self.path}.artifacts'
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')          # durable across process crashes, cheap commits
+        self._conn.executescript(_SCHEMA)
+
+    #############################################################################################################
+    #
+    #                                                   Writing
+    #
+    #############################################################################################################
+
+    def append(self,
+        op: str,
+        payload: Dict[str, Any],
+        run_id: Optional[str] = None
+    ) -> int:
+
+        with self._lock:
+            cursor = self._conn.execute('INSERT INTO ops (op, run_id, payload) VALUES (?, ?, ?)', (op, run_id, json.dumps(payload)))
+            return cursor.lastrowid
+
+    def append_many(self,
+        rows: List[Tuple[str, Optional[str], Dict[str, Any]]]
+    ):
+
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.executemany('INSERT INTO ops (op, run_id, payload) VALUES (?, ?, ?)', [(op, run_id, json.dumps(payload)) for op, run_id, payload in rows])
+            self._conn.execute('COMMIT')
+
+    def store_artifact(self,
+        local_path: str
+    ) -> str:
+
+        target = os.path.join(self.artifact_dir, uuid.uuid4().hex, os.path.basename(os.path.normpath(local_path)))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.isdir(local_path):
+            shutil.copytree(local_path, target)
+        else:
+            shutil.copy2(local_path, target)
+
+        return target
+
+    #############################################################################################################
+    #
+    #                                                   Reading
+    #
+    #############################################################################################################
+
+    def ops(self,
+        op: Optional[str] = None,
+        run_id: Optional[str] = None
+    ) -> Iterator[Tuple[int, str, Optional[str], Dict[str, Any]]]:
+
+        query, args = 'SELECT seq, op, run_id, payload FROM ops WHERE 1 = 1', []
+        if op is not None:
+            query, args = query + ' AND op = ?', args + [op]
+        if run_id is not None:
+            query, args = query + ' AND run_id = ?', args + [run_id]
+
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY seq', args).fetchall()
+        for seq, row_op, row_run_id, payload in rows:
+            yield seq, row_op, row_run_id, json.loads(payload)
+
+    def ops_by_run(self,
+        run_ids: List[str],
+        chunk_size: int = 500
+    ) -> Dict[str, List[Tuple[str, Dict[str, Any]]]]:
+
+        # One query per chunk of runs instead of one per run; chunks stay under SQLite's bound parameter limit
+        grouped: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {run_id: [] for run_id in run_ids}
+        for start in range(0, len(run_ids), chunk_size):
+            chunk = run_ids[start:start + chunk_size]
+            query = f'SELECT op, run_id, payload FROM ops WHERE run_id IN ({", ".join("?" * len(chunk))}) ORDER BY seq'
+            with self._lock:
+                rows = self._conn.execute(query, chunk).fetchall()
+            for op, run_id, payload in rows:
+                grouped[run_id].append((op, json.loads(payload)))
+
+        return grouped
+
+    def pending(self,
+        limit: int = 10_000
+    ) -> List[Tuple[int, str, Optional[str], Dict[str, Any]]]:
+
+        with self._lock:
+            rows = self._conn.execute('SELECT seq, op, run_id, payload FROM ops WHERE synced = 0 ORDER BY seq LIMIT ?', (limit,)).fetchall()
+
+        return [(seq, op, run_id, json.loads(payload)) for seq, op, run_id, payload in rows]
+
+    def mark_synced(self,
+        seqs: List[int]
+    ):
+
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.executemany('UPDATE ops SET synced = 1 WHERE seq = ?', [(seq,) for seq in seqs])
+            self._conn.execute('COMMIT')
+
+    def counts(self) -> Dict[str, int]:
+
+        with self._lock:
+            total, synced = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(synced), 0) FROM ops').fetchone()
+
+        return {'total': total, 'synced': synced, 'pending': total - synced}
+
+    def remote_id(self,
+        local_id: str
+    ) -> Optional[str]:
+
+        with self._lock:
+            row = self._conn.execute('SELECT remote_id FROM ids WHERE local_id = ?', (local_id,)).fetchone()
+
+        return row[0] if row else None
+
+    def set_remote_id(self,
+        local_id: str,
+        remote_id: str
+    ):
+
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO ids (local_id, remote_id) VALUES (?, ?)', (local_id, remote_id))
+
+    def close(self):
+
+        with self._lock:
+            self._conn.close()
+
+
+class JournalClient:
+    """
+    Drop-in for the subset of MlflowClient that MLFlowClientWrapper uses for tracking. Writes go to the
+    journal; reads (experiment and run lookup, get_run, list_artifacts) are answered from it. The model
+    registry and runs:/ model URIs need the server and are not available offline.
+    """
+
+    def __init__(self,
+        journal: TrackingJournal
+    ):
+
+        self.journal = journal
+
+        # Identifies the journal in process-wide caches keyed by tracking uri
+        self.tracking_uri = f'journal://{journal.path}'
+
+    #############################################################################################################
+    #
+    #                                            Experiments and Runs
+    #
+    #############################################################################################################
+
+    def get_experiment_by_name(self,
+        name: str
+    ) -> Optional[SimpleNamespace]:
+
+        for _, _, _, payload in self.journal.ops('create_experiment'):
+            if payload['name'] == name:
+                return SimpleNamespace(experiment_id=payload['experiment_id'], name=name, lifecycle_stage='active')
+
+        return None
+
+    def get_experiment(self,
+        experiment_id: str
+    ) -> SimpleNamespace:
+
+        from mlflow.exceptions import MlflowException
+
+        for _, _, _, payload in self.journal.ops('create_experiment'):
+            if payload['experiment_id'] == experiment_id:
+                return SimpleNamespace(experiment_id=experiment_id, name=payload['name'], lifecycle_stage='active')
+
+        raise MlflowException(f"Experiment '{experiment_id}' is not in the journal {self.journal.path}", error_code='RESOURCE_DOES_NOT_EXIST')
+
+    def create_experiment(self,
+        name: str,
+        **kwargs
+    ) -> str:
+
+        from mlflow.exceptions import MlflowException
+
+        if self.get_experiment_by_name(name) is not None:
+            raise MlflowException(f"Experiment '{name}' already exists.", error_code='RESOURCE_ALREADY_EXISTS')
+
+        experiment_id = f'local-{uuid.uuid4().hex}'
+        self.journal.append('create_experiment', {'experiment_id': experiment_id, 'name': name})
+
+        return experiment_id
+
+    def create_run(self,
+        experiment_id: str,
+        start_time: Optional[int] = None,
+        tags: Optional[Dict[str, Any]] = None,
+        run_name: Optional[str] = None
+    ) -> SimpleNamespace:
+
+        tags = {key: str(value) for key, value in (tags or {}).items()}
+        run_name = run_name or tags.get('mlflow.runName')
+        if run_name is not None:
+            tags['mlflow.runName'] = run_name
+
+        run_id = f'local-{uuid.uuid4().hex}'
+        payload = {'experiment_id': experiment_id, 'start_time': start_time or get_current_time_millis(), 'tags': tags}
+        self.journal.append('create_run', payload, run_id)
+
+        return self.get_run(run_id)
+
+    def search_runs(self,
+        experiment_ids: Any,
+        filter_string: str = '',
+        max_results: int = 1000,
+        **kwargs
+    ) -> List[SimpleNamespace]:
+
+        # Only the run name filters used by MLFlowClientWrapper (= and LIKE) are understood
+        experiment_ids = [experiment_ids] if isinstance(experiment_ids, str) else list(experiment_ids)
+        match = _RUN_NAME_FILTER.search(filter_string or '')
+        name_pattern = None
+        if match:
+            operator, value = match.group(1).upper(), match.group(2) if match.group(2) is not None else match.group(3)
+            escaped = re.escape(value)
+            name_pattern = re.compile(escaped.replace('%', '.*').replace('_', '.') if operator == 'LIKE' else escaped)
+
+        run_ids = [
+            run_id for _, _, run_id, payload in self.journal.ops('create_run')
+            if payload['experiment_id'] in experiment_ids and (name_pattern is None or name_pattern.fullmatch(payload['tags'].get('mlflow.runName') or ''))
+        ][:max_results]
+
+        return [self._build_run(run_id, run_ops) for run_id, run_ops in self.journal.ops_by_run(run_ids).items()]
+
+    def get_run(self,
+        run_id: str
+    ) -> SimpleNamespace:
+
+        return self._build_run(run_id, [(op, payload) for _, op, _, payload in self.journal.ops(run_id=run_id)])
+
+    def _build_run(self,
+        run_id: str,
+        run_ops: List[Tuple[str, Dict[str, Any]]]
+    ) -> SimpleNamespace:
+
+        info, params, metrics, tags = None, {}, {}, {}
+        latest: Dict[str, Tuple[int, int]] = {}
+        for op, payload in run_ops:
+            if op == 'create_run':
+                tags.update(payload['tags'])
+                info = SimpleNamespace(
+                    run_id=run_id, experiment_id=payload['experiment_id'], run_name=payload['tags'].get('mlflow.runName'),
+                    start_time=payload['start_time'], end_time=None, status='RUNNING', lifecycle_stage='active'
+                )
+            elif op == 'log_metric':
+                # Like the server: the value with the largest (step, timestamp) wins
+                order = (payload['step'], payload['timestamp'])
+                if payload['key'] not in latest or order >= latest[payload['key']]:
+                    latest[payload['key']] = order
+                    metrics[payload['key']] = payload['value']
+            elif op == 'log_param':
+                params[payload['key']] = payload['value']
+            elif op == 'set_tag':
+                tags[payload['key']] = payload['value']
+            elif op == 'set_terminated' and info is not None:
+                info.status, info.end_time = payload['status'], payload['end_time']
+
+        if info is None:
+            raise ValueError(f"Run '{run_id}' is not in the journal {self.journal.path}")
+
+        return SimpleNamespace(info=info, data=SimpleNamespace(params=params, metrics=metrics, tags=tags))
+
+    def set_terminated(self,
+        run_id: str,
+        status: str = 'FINISHED',
+        end_time: Optional[int] = None
+    ):
+
+        self.journal.append('set_terminated', {'status': status, 'end_time': end_time or get_current_time_millis()}, run_id)
+
+    #############################################################################################################
+    #
+    #                                          Metrics, Params and Tags
+    #
+    #############################################################################################################
+
+    def log_metric(self,
+        run_id: str,
+        key: str,
+        value: float,
+        timestamp: Optional[int] = None,
+        step: Optional[int] = None,
+        **kwargs
+    ):
+
+        self.journal.append('log_metric', {'key': key, 'value': float(value), 'timestamp': timestamp or get_current_time_millis(), 'step': step or 0}, run_id)
+
+    def log_param(self,
+        run_id: str,
+        key: str,
+        value: Any,
+        **kwargs
+    ):
+
+        self.journal.append('log_param', {'key': key, 'value': str(value)}, run_id)
+
+    def set_tag(self,
+        run_id: str,
+        key: str,
+        value: Any,
+        **kwargs
+    ):
+
+        self.journal.append('set_tag', {'key': key, 'value': str(value)}, run_id)
+
+    def log_batch(self,
+        run_id: str,
+        metrics: List[Any] = (),
+        params: List[Any] = (),
+        tags: List[Any] = (),
+        **kwargs
+    ):
+
+        rows = [('log_metric', run_id, {'key': m.key, 'value': float(m.value), 'timestamp': m.timestamp, 'step': m.step}) for m in metrics]
+        rows += [('log_param', run_id, {'key': p.key, 'value': str(p.value)}) for p in params]
+        rows += [('set_tag', run_id, {'key': t.key, 'value': str(t.value)}) for t in tags]
+        self.journal.append_many(rows)
+
+    #############################################################################################################
+    #
+    #                                                  Artifacts
+    #
+    #############################################################################################################
+
+    def log_artifact(self,
+        run_id: str,
+        local_path: str,
+        artifact_path: Optional[str] = None
+    ):
+
+        stored = self.journal.store_artifact(local_path)
+        self.journal.append('log_artifact', {'local_path': stored, 'artifact_path': artifact_path}, run_id)
+
+    def log_artifacts(self,
+        run_id: str,
+        local_dir: str,
+        artifact_path: Optional[str] = None
+    ):
+
+        stored = self.journal.store_artifact(local_dir)
+        self.journal.append('log_artifacts', {'local_path': stored, 'artifact_path': artifact_path}, run_id)
+
+    def log_image(self,
+        run_id: str,
+        image: Any,
+        artifact_file: str
+    ):
+
+        import tempfile
+        import numpy as np
+        import mlflow
+
+        # Same conversions as MlflowClient.log_image(artifact_file=...): numpy and mlflow.Image become PIL
+        if isinstance(image, np.ndarray):
+            image = mlflow.Image(image)
+        if isinstance(image, mlflow.Image):
+            image = image.to_pil()
+
+        artifact_dir = posixpath.dirname(posixpath.normpath(artifact_file))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = os.path.join(tmp_dir, posixpath.basename(artifact_file))
+            image.save(tmp_path)
+            self.log_artifact(run_id, tmp_path, artifact_dir or None)
+
+    def _artifact_files(self,
+        run_id: str
+    ) -> Dict[str, int]:
+
+        # {run-relative file path: size} of every file logged to the run
+        files = {}
+        for _, op, _, payload in self.journal.ops(run_id=run_id):
+            if op not in ('log_artifact', 'log_artifacts'):
+                continue
+
+            # log_artifact keeps the file or directory name; log_artifacts logs the directory's contents
+            stored, artifact_path = payload['local_path'], payload['artifact_path'] or ''
+            root = posixpath.join(artifact_path, os.path.basename(stored)) if op == 'log_artifact' else artifact_path
+            if not os.path.isdir(stored):
+                files[root.strip('/')] = os.path.getsize(stored)
+                continue
+            for directory, _, names in os.walk(stored):
+                relative_dir = os.path.relpath(directory, stored).replace(os.sep, '/')
+                for name in names:
+                    files[posixpath.normpath(posixpath.join(root, relative_dir, name)).strip('/')] = os.path.getsize(os.path.join(directory, name))
+
+        return files
+
+    def list_artifacts(self,
+        run_id: str,
+        path: Optional[str] = None
+    ) -> List[SimpleNamespace]:
+
+        # Direct children of path, with run-relative paths, like MlflowClient.list_artifacts(run_id, path)
+        prefix = f"{path.strip('/')}/" if path and path.strip('/') else ''
+        entries: Dict[str, Tuple[bool, Optional[int]]] = {}
+        for file_path, size in self._artifact_files(run_id).items():
+            if not file_path.startswith(prefix):
+                continue
+            name, separator, _ = file_path[len(prefix):].partition('/')
+            entries[prefix + name] = (True, None) if separator else (False, size)
+
+        return [SimpleNamespace(path=entry_path, is_dir=is_dir, file_size=size) for entry_path, (is_dir, size) in sorted(entries.items())]
+
+
+class JournalSyncer:
+    """
+    Replays unsynced journal operations against a real MlflowClient. Metrics, params and tags are coalesced
+    per run into limit-sized log_batch requests; operations are marked synced only after the server
+    accepted them, so an interrupted sync resends at most the batch in flight.
+    """
+
+    def __init__(self,
+        journal: TrackingJournal,
+        client: MlflowClient
+    ):
+
+        self.journal = journal
+        self.client = client
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _remote_experiment_id(self,
+        local_id: str
+    ) -> str:
+
+        remote_id = self.journal.remote_id(local_id)
+        if remote_id is None:
+            raise ValueError(f"Experiment '{local_id}' has not been synced yet")
+
+        return remote_id
+
+    def _remote_run_id(self,
+        local_id: str
+    ) -> str:
+
+        remote_id = self.journal.remote_id(local_id)
+        if remote_id is None:
+            raise ValueError(f"Run '{local_id}' has not been synced yet")
+
+        return remote_id
+
+    def _apply(self,
+        op: str,
+        run_id: Optional[str],
+        payload: Dict[str, Any]
+    ):
+
+        from .experiments import get_experiment_id, create_experiment_id
+
+        if op == 'create_experiment':
+            remote_id = get_experiment_id(self.client, payload['name'], validate=True)
+            if remote_id is None:
+                remote_id, _ = create_experiment_id(self.client, payload['name'])
+            self.journal.set_remote_id(payload['experiment_id'], remote_id)
+
+        elif op == 'create_run':
+            experiment_id = self._remote_experiment_id(payload['experiment_id'])
+
+            # A previous sync may have created the run and crashed before recording it
+            existing = self.client.search_runs([experiment_id], filter_string=f"tags.`{LOCAL_RUN_ID_TAG}` = '{run_id}'", max_results=1)
+            if existing:
+                remote_id = existing[0].info.run_id
+            else:
+                tags = {**payload['tags'], LOCAL_RUN_ID_TAG: run_id}
+                remote_id = self.client.create_run(experiment_id, start_time=payload['start_time'], tags=tags).info.run_id
+            self.journal.set_remote_id(run_id, remote_id)
+
+        elif op == 'set_terminated':
+            self.client.set_terminated(self._remote_run_id(run_id), status=payload['status'], end_time=payload['end_time'])
+
+        elif op == 'log_artifact':
+            self.client.log_artifact(self._remote_run_id(run_id), payload['local_path'], payload['artifact_path'])
+
+        elif op == 'log_artifacts':
+            self.client.log_artifacts(self._remote_run_id(run_id), payload['local_path'], payload['artifact_path'])
+
+        else:
+            raise ValueError(f"Unknown journal operation '{op}'")
+
+    def _send_entities(self,
+        entities: Dict[str, Dict[str, Any]]
+    ):
+
+        from mlflow.entities import Metric, Param, RunTag
+        from .batching import log_batch_chunked
+
+        for run_id, run_entities in entities.items():
+            log_batch_chunked(
+                self.client,
+                self._remote_run_id(run_id),
+                metrics=[Metric(m['key'], m['value'], m['timestamp'], m['step']) for m in run_entities['metrics']],
+                params=[Param(key, value) for key, value in run_entities['params'].items()],
+                tags=[RunTag(key, value) for key, value in run_entities['tags'].items()]
+            )
+            self.journal.mark_synced(run_entities['seqs'])
+        entities.clear()
+
+    def sync_once(self,
+        max_ops: int = 10_000
+    ) -> int:
+
+        rows = self.journal.pending(max_ops)
+
+        # {local run id: {'metrics': [...], 'params': {...}, 'tags': {...}, 'seqs': [...]}}, sent before any other op
+        entities: Dict[str, Dict[str, Any]] = {}
+        for seq, op, run_id, payload in rows:
+            if op in ('log_metric', 'log_param', 'set_tag'):
+                run_entities = entities.setdefault(run_id, {'metrics': [], 'params': {}, 'tags': {}, 'seqs': []})
+                if op == 'log_metric':
+                    run_entities['metrics'].append(payload)
+                elif op == 'log_param':
+                    run_entities['params'][payload['key']] = payload['value']       # a batch may not repeat a key
+                else:
+                    run_entities['tags'][payload['key']] = payload['value']
+                run_entities['seqs'].append(seq)
+                continue
+
+            self._send_entities(entities)
+            self._apply(op, run_id, payload)
+            self.journal.mark_synced([seq])
+
+        self._send_entities(entities)
+
+        return len(rows)
+
+    def sync(self,
+        max_ops: int = 10_000
+    ) -> int:
+
+        synced = 0
+        while True:
+            count = self.sync_once(max_ops)
+            synced += count
+            if count < max_ops:
+                return synced
+
+    def start(self,
+        interval: float = 30.0
+    ):
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f'Journal sync failed, retrying in {interval:.0f}s: {e}')
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='mlflow-journal-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self,
+        final_sync: bool = True
+    ):
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if final_sync:
+            self.sync()
+
+
+def main(argv: Optional[List[str]] = None):
+
+    parser = argparse.ArgumentParser(description='Inspect or sync a local MLflow tracking journal')
+    parser.add_argument('command', choices=['sync', 'status'])
+    parser.add_argument('--journal', required=True)
+    parser.add_argument('--tracking-uri', default=os.getenv('MLFLOW_TRACKING_URI'))
+    parser.add_argument('--max-ops', type=int, default=10_000)
+    parser.add_argument('--loop', type=float, default=None, help='keep syncing every LOOP seconds')
+    args = parser.parse_args(argv)
+
+    journal = TrackingJournal(args.journal)
+    if args.command == 'status':
+        print(journal.counts())
+        return
+
+    from mlflow.tracking import MlflowClient
+
+    syncer = JournalSyncer(journal, MlflowClient(args.tracking_uri))
+    while True:
+        start = time.time()
+        synced = syncer.sync(args.max_ops)
+        print(f'Synced {synced:,} operations in {time.time() - start:.1f}s; {journal.counts()}')
+        if args.loop is None:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == '__main__':
+    main()
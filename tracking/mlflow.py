@@ -1,12 +1,20 @@
+from __future__ import annotations
+
 import os
-import mlflow
-from mlflow.tracking import MlflowClient
-from mlflow.entities import Run, Param, Metric, RunTag
-from mlflow.utils.file_utils import TempDir
 from dotenv import load_dotenv
-from typing import Optional, List, Union, Any, Dict
+from typing import Optional, Union, Any, Dict, TYPE_CHECKING
+
+from .utils import get_current_time_millis, prepare_mlflow_metrics
+from .batching import log_batch_chunked
+from .experiments import get_experiment_id, create_experiment_id, forget_experiment_id
+from ..lazy import lazy_import
+
+# Heavy dependencies load on first use
+mlflow = lazy_import('mlflow')
 
-from .utils import get_current_time_millis
+if TYPE_CHECKING:
+    from mlflow.tracking import MlflowClient
+    from mlflow.entities import Run
 
 class MLflowClientWrapper:
     def __init__(self,
@@ -19,7 +27,7 @@ class MLflowClientWrapper:
         else:
             uri = os.getenv('MLFLOW_DEV_URI')
             
-        self.client = MlflowClient(uri)
+        self.client = mlflow.tracking.MlflowClient(uri)
         self.experiment_name = None
         self.experiment_id = None
         self.run_object = None
@@ -27,26 +35,28 @@ class MLflowClientWrapper:
         self.run_id = None
     
     def create_experiment(self,
-        experiment_name: str
+        experiment_name: str,
+        exist_ok: bool = False
     ):
         
-        experiment_names = self._list_experiments(client=self.client)
-        
-        if experiment_name in experiment_names:
+        if not exist_ok and get_experiment_id(self.client, experiment_name, validate=True) is not None:
+            raise ValueError(f"Experiment '{experiment_name}' already exists. Please create a new experiment using a different name or use set_experiment().")
+
+        # Race-safe: a concurrent create surfaces as created=False instead of a server error
+        print(f"Creating new experiment with '{experiment_name}'")
+        _, created = create_experiment_id(self.client, experiment_name)
+        if not created and not exist_ok:
             raise ValueError(f"Experiment '{experiment_name}' already exists. Please create a new experiment using a different name or use set_experiment().")
-        else:
-            print(f"Creating new experiment with '{experiment_name}'")
-            self.client.create_experiment(name=experiment_name)
     
     def set_experiment(self,
         experiment_name: str
     ):
         
-        experiment_names = self._list_experiments(client=self.client)
+        experiment_id = get_experiment_id(self.client, experiment_name, validate=True)
         
-        if experiment_name in experiment_names:
+        if experiment_id is not None:
             print(f"Experiment '{experiment_name}' already exists. Setting the experiment to '{experiment_name}'")
-            self.experiment_id = self.client.get_experiment_by_name(name=experiment_name).experiment_id
+            self.experiment_id = experiment_id
             self.experiment_name = experiment_name
         else:
             raise ValueError(f"Experiment '{experiment_name}' does not exist. Please create it with create_experiment()")
@@ -75,10 +85,17 @@ class MLflowClientWrapper:
             tags['Owner'] = os.uname()[1].split("-")[1]
             
         # Create Run Object
-        self.run_object = self.client.create_run(
-            experiment_id = self.experiment_id,
-            tags = tags
-        )
+        from mlflow.exceptions import MlflowException
+        try:
+            self.run_object = self.client.create_run(
+                experiment_id = self.experiment_id,
+                tags = tags
+            )
+        except MlflowException as e:
+            # Deleted since it was looked up: drop the cached id so the next lookup goes to the server
+            if e.error_code in ('INVALID_STATE', 'RESOURCE_DOES_NOT_EXIST'):
+                forget_experiment_id(self.client, self.experiment_name)
+            raise
     
     def set_run(self,
         run_name: str
@@ -129,12 +146,13 @@ class MLflowClientWrapper:
         params: Dict[str, Any]
     ):
         
+        from mlflow.entities import Param
+
         params_arr = [Param(key, str(value)) for key, value in params.items()]
-        self.client.log_batch(
+        log_batch_chunked(
+            self.client,
             run_id = self.run_id,
-            metrics = [],
-            params = params_arr,
-            tags = []
+            params = params_arr
         )
 
     def get_params(self
@@ -154,16 +172,20 @@ class MLflowClientWrapper:
             self.run_id, key=key, value=value)
 
     def log_metrics(self,
-        metrics: Dict[str, float]
+        metrics: Dict[str, float],
+        step: Optional[int] = None,
+        timestamp: Optional[int] = None
     ):
         
-        timestamp = get_current_time_millis()
-        metrics_arr = [Metric(key, value, timestamp, 0) for key, value in metrics.items()]
-        self.client.log_batch(
+        from mlflow.entities import Metric
+
+        names, values = prepare_mlflow_metrics(metrics)
+        timestamp = timestamp or get_current_time_millis()
+        metrics_arr = [Metric(name, value, timestamp, step or 0) for name, value in zip(names, values)]
+        log_batch_chunked(
+            self.client,
             run_id = self.run_id,
-            metrics = metrics_arr,
-            params = [],
-            tags = []
+            metrics = metrics_arr
         )
     
     def get_metrics(self
@@ -185,11 +207,12 @@ class MLflowClientWrapper:
     def log_tags(self,
         tags: Dict[str, Any]
     ):
+        from mlflow.entities import RunTag
+
         tags_arr = [RunTag(key, str(value)) for key, value in tags.items()]
-        self.client.log_batch(
+        log_batch_chunked(
+            self.client,
             run_id = self.run_id,
-            metrics = [],
-            params = [],
             tags = tags_arr
         )
     
@@ -308,6 +331,8 @@ class MLflowClientWrapper:
         await_registration_for=300,
         **kwargs,
     ):
+        from mlflow.utils.file_utils import TempDir
+
         with TempDir() as tmp:
             local_path = tmp.path("model")
             
@@ -333,16 +358,6 @@ class MLflowClientWrapper:
 
         return mlflow_model.get_model_info()
     
-    @staticmethod
-    def _list_experiments(
-        client: MlflowClient,
-    ) -> List[str]:
-
-        experiments = client.list_experiments()
-        experiment_names = [e.name for e in experiments]
-        
-        return experiment_names
-        
     @staticmethod
     def _get_run_id_within_experiment(
         client: MlflowClient,
@@ -350,7 +365,7 @@ class MLflowClientWrapper:
         run_name: str
     ) -> Union[str, None]:
         
-        experiment_id = client.get_experiment_by_name(experiment_name).experiment_id
+        experiment_id = get_experiment_id(client, experiment_name)
         df = mlflow.search_runs(
             experiment_ids=experiment_id, filter_string=f'tags."mlflow.runName"="{run_name}"')
 
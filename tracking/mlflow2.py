@@ -1,29 +1,42 @@
-from typing import Dict, Optional, Any, Union, List
+from __future__ import annotations
+
+from typing import Dict, Optional, Any, Union, List, TYPE_CHECKING
 
 import os
 import io
-import mlflow
 from dotenv import load_dotenv
-from mlflow.tracking import MlflowClient
-from mlflow.entities import Metric
 
-from .utils import prefix_print, sanitize_mlflow_metric_name, get_current_time_millis
+from .utils import prefix_print, log, sanitize_mlflow_metric_name, prepare_mlflow_metrics, get_current_time_millis
+from .experiments import get_experiment_id, create_experiment_id, forget_experiment_id
+from .journal import TrackingJournal, JournalClient, JournalSyncer
+from .artifacts import ArtifactIndex, upload_directory
+from .model_cache import model_cache, version_resolver
+from .batching import BatchLogger, log_batch_chunked, log_batch_concurrent, curve_arrays, curve_metrics
+from ..lazy import lazy_import
+
+# Heavy dependencies load on first use; matplotlib, PIL and numpy are only imported by log_image
+mlflow = lazy_import('mlflow')
 
-# For assertion and type-hinting
-from mlflow.models import ModelSignature
-import matplotlib.pyplot as plt
-from PIL import Image
-import numpy as np
+# For type-hinting
+if TYPE_CHECKING:
+    from mlflow.models import ModelSignature
 
 class MLFlowClientWrapper:
-    def __init__(self):
+    def __init__(self,
+        journal_path: Optional[str] = None      # offline mode: track into a local journal, push later with sync_journal()
+    ):
         load_dotenv()
         os.environ["MLFLOW_TRACKING_URI"] = "https://"
         os.environ["MLFLOW_TRACKING_USERNAME"] = ""
         os.environ["MLFLOW_TRACKING_PASSWORD"] = ""
         uri = "https://"
 
-        self.client = MlflowClient(uri)
+        self.tracking_uri = uri
+        self.journal = TrackingJournal(journal_path) if journal_path is not None else None
+        self.client = JournalClient(self.journal) if self.journal is not None else mlflow.tracking.MlflowClient(uri)
+
+        # Cached list_artifacts results per run, updated by the uploads made through this wrapper
+        self.artifact_index = ArtifactIndex(self.client)
 
         # class attributes tracked
         self.experiment_name = None
@@ -32,6 +45,12 @@ class MLFlowClientWrapper:
         self.run_id = None
         self.run_object = None
 
+        # {experiment_id: {run_name: run_id}}, filled by filtered lookups and by create_run
+        self._run_index: Dict[str, Dict[str, str]] = {}
+
+        # Set by enable_async_logging(); metrics, params and tags are then queued and sent via log_batch
+        self.batch_logger: Optional[BatchLogger] = None
+
         # Do not edit
         self.flavor_lib_dict = {
             "lightgbm": mlflow.lightgbm,
@@ -40,6 +59,13 @@ class MLFlowClientWrapper:
             "sklearn": mlflow.sklearn
         }
     
+    def _require_server(self,
+        action: str
+    ):
+        # The journal records tracking data only; the model registry and runs:/ URIs need the server
+        if self.journal is not None:
+            raise ValueError(f"{action} is not supported in offline mode. Push the journal with sync_journal() and use a wrapper without journal_path.")
+
     #############################################################################################################
     #
     #                                             Experiment Methods
@@ -48,29 +74,31 @@ class MLFlowClientWrapper:
 
     @prefix_print("[EXPERIMENT]")
     def create_experiment(self,
-        experiment_name: str
+        experiment_name: str,
+        exist_ok: bool = False          # True: jobs starting concurrently all end up on the same experiment
     ):
-        experiments = mlflow.search_experiments()
-        experiment_names = [experiment.name for experiment in experiments]
-
-        if experiment_name in experiment_names:
+        if not exist_ok and get_experiment_id(self.client, experiment_name, validate=True) is not None:
             raise ValueError(f"Experiment '{experiment_name}' already exists. Please create a new experiment using a different name or use set_experiment().")
-        else:
-            print(f"Creating new experiment with '{experiment_name}'")
-            experiment_id = self.client.create_experiment(experiment_name)
+
+        log(f"Creating new experiment with '{experiment_name}'")
+        experiment_id, created = create_experiment_id(self.client, experiment_name)
+        if not created:
+            if not exist_ok:
+                raise ValueError(f"Experiment '{experiment_name}' already exists. Please create a new experiment using a different name or use set_experiment().")
+            log(f"Experiment '{experiment_name}' was created concurrently. Setting the experiment to '{experiment_name}'")
 
         self.experiment_id = experiment_id
+        self.experiment_name = experiment_name
 
     @prefix_print("[EXPERIMENT]")
     def set_experiment(self,
         experiment_name: str
     ):
-        experiments = mlflow.search_experiments()
-        experiment_names = [experiment.name for experiment in experiments]
+        experiment_id = get_experiment_id(self.client, experiment_name, validate=True)
 
-        if experiment_name in experiment_names:
-            print(f"Found experiment '{experiment_name}'. Setting the experiment to '{experiment_name}'")
-            self.experiment_id = self.client.get_experiment_by_name(name=experiment_name).experiment_id
+        if experiment_id is not None:
+            log(f"Found experiment '{experiment_name}'. Setting the experiment to '{experiment_name}'")
+            self.experiment_id = experiment_id
             self.experiment_name = experiment_name
         else:
             self.experiment_id = None
@@ -83,6 +111,60 @@ class MLFlowClientWrapper:
     #
     #############################################################################################################
 
+    @staticmethod
+    def _run_name_filter(
+        run_name: str
+    ) -> str:
+
+        # MLflow's filter parser has no escape sequences, so quote with the character the name does not contain.
+        # A name containing both is searched with LIKE, single quotes matching as '_', and compared exactly afterwards.
+        if "'" not in run_name:
+            return f"tags.`mlflow.runName` = '{run_name}'"
+        if '"' not in run_name:
+            return f'tags.`mlflow.runName` = "{run_name}"'
+        return "tags.`mlflow.runName` LIKE '{}'".format(run_name.replace("'", '_'))
+
+    def _get_indexed_run(self,
+        run_id: str,
+        run_name: str
+    ) -> Optional[Any]:
+
+        from mlflow.exceptions import MlflowException
+
+        # An indexed run may have been deleted or renamed since; only a live run with the same name counts
+        try:
+            run = self.client.get_run(run_id)
+        except MlflowException as e:
+            if e.error_code != 'RESOURCE_DOES_NOT_EXIST':
+                raise
+            return None
+
+        if run.info.lifecycle_stage != 'active' or run.data.tags.get('mlflow.runName') != run_name:
+            return None
+
+        return run
+
+    def _find_run(self,
+        run_name: str
+    ) -> Optional[Any]:
+
+        # Known names cost one get_run by id; unknown or stale names cost one filtered search, not a full scan
+        run_index = self._run_index.setdefault(self.experiment_id, {})
+        if run_name in run_index:
+            run = self._get_indexed_run(run_index[run_name], run_name)
+            if run is not None:
+                return run
+            run_index.pop(run_name, None)
+
+        exact = "'" not in run_name or '"' not in run_name
+        runs = self.client.search_runs([self.experiment_id], filter_string=self._run_name_filter(run_name), max_results=1 if exact else 100)
+        run = next((run for run in runs if run.data.tags.get('mlflow.runName') == run_name), None)
+        if run is None:
+            return None
+
+        run_index[run_name] = run.info.run_id
+        return run
+
     @prefix_print("[RUN]")
     def create_run(self,
         run_name: str,
@@ -90,9 +172,8 @@ class MLFlowClientWrapper:
     ):
         assert self.experiment_id is not None, f"'experiment_id' or 'experiment_name' is not None. Please set the experiment first by running the 'set_experiment()' method"
 
-        # Get the run names
-        run_names = [run.info.run_name for run in self.client.search_runs(self.experiment_id)]
-        if run_name in run_names:
+        # Check the run name
+        if self._find_run(run_name) is not None:
             raise ValueError(f"A run with the name '{run_name}' in '{self.experiment_name}' already exists. Please choose a different run name or use set_run()")
         
         # Add Owner and Run Names to Tags
@@ -108,11 +189,19 @@ class MLFlowClientWrapper:
         tags["mlflow.runName"] = run_name
 
         # Crate Run Object
-        print(f"Creating new run '{run_name}' in experiment '{self.experiment_name}'")
-        self.run_object = self.client.create_run(
-            experiment_id = self.experiment_id,
-            tags = tags
-        )
+        log(f"Creating new run '{run_name}' in experiment '{self.experiment_name}'")
+        from mlflow.exceptions import MlflowException
+        try:
+            self.run_object = self.client.create_run(
+                experiment_id = self.experiment_id,
+                tags = tags
+            )
+        except MlflowException as e:
+            # Deleted since it was looked up: drop the cached id so the next lookup goes to the server
+            if e.error_code in ('INVALID_STATE', 'RESOURCE_DOES_NOT_EXIST'):
+                forget_experiment_id(self.client, self.experiment_name)
+            raise
+        self._run_index.setdefault(self.experiment_id, {})[run_name] = self.run_object.info.run_id
 
     @prefix_print("[RUN]")
     def set_run(self,
@@ -120,19 +209,19 @@ class MLFlowClientWrapper:
     ):
         assert self.experiment_id is not None, f"'experiment_id' or 'experiment_name' is not None. Please set the experiment first by running the 'set_experiment()' method"
         
-        # Get the run names and run_id and store them in a dictionary
-        runs_dict = {run.info.run_name: run.info.run_id for run in self.client.search_runs(self.experiment_id)}
+        # Get the run
+        run_object = self._find_run(run_name)
 
-        if run_name not in runs_dict:
+        if run_object is None:
             self.run_id = None
             self.run_name = None
             raise ValueError(f"A run with the name '{run_name}' in '{self.experiment_name}' DOES NOT exist!")
         
-        self.run_id = runs_dict[run_name]
+        self.run_id = run_object.info.run_id
         self.run_name = run_name
-        self.run_object = self.get_run(run_name=run_name)
+        self.run_object = run_object
         
-        print(f"Set the run to '{run_name}' in experiment '{self.experiment_name}'")
+        log(f"Set the run to '{run_name}' in experiment '{self.experiment_name}'")
 
     @prefix_print("[RUN]")
     def get_run(self,
@@ -140,17 +229,50 @@ class MLFlowClientWrapper:
     ):
         assert self.experiment_id is not None, f"'experiment_id' or 'experiment_name' is not None. Please set the experiment first by running the 'set_experiment()' method"
 
-        # Get the run names and run_id and store them in a dictionary
-        runs_dict = {run.info.run_name: run.info.run_id for run in self.client.search_runs(self.experiment_id)}
+        # Get the run
+        run_object = self._find_run(run_name)
 
         # Thou shall not pass if DOES NOT exist
-        if run_name not in runs_dict:
+        if run_object is None:
             raise ValueError(f"A run with the name '{run_name}' in '{self.experiment_name}' DOES NOT exist!")
         
-        run_object = self.client.get_run(runs_dict[run_name])
-        
         return run_object
 
+    #############################################################################################################
+    #
+    #                                            Async Logging Methods
+    #
+    #############################################################################################################
+
+    def enable_async_logging(self,
+        flush_interval: float = 2.0
+    ):
+        if self.batch_logger is None:
+            self.batch_logger = BatchLogger(self.client, flush_interval=flush_interval)
+
+    def flush(self):
+        if self.batch_logger is not None:
+            self.batch_logger.flush()
+
+    def disable_async_logging(self):
+        if self.batch_logger is not None:
+            batch_logger, self.batch_logger = self.batch_logger, None
+            batch_logger.close()            # raises if queued metrics, params or tags could not be sent
+
+    @prefix_print("[JOURNAL]")
+    def sync_journal(self,
+        tracking_uri: Optional[str] = None,
+        max_ops: int = 10_000
+    ) -> int:
+        assert self.journal is not None, "Offline mode is off. Create the wrapper with journal_path to use a journal"
+
+        self.flush()
+        syncer = JournalSyncer(self.journal, mlflow.tracking.MlflowClient(tracking_uri or self.tracking_uri))
+        synced = syncer.sync(max_ops)
+        log(f"Synced {synced:,} operations from '{self.journal.path}': {self.journal.counts()}")
+
+        return synced
+
     #############################################################################################################
     #
     #                                               Param Methods
@@ -161,18 +283,27 @@ class MLFlowClientWrapper:
         key: str,
         value: Any
     ):
+        if self.batch_logger is not None:
+            self.batch_logger.log_param(self.run_id, key, value)
+            return
         self.client.log_param(self.run_id, key=key, value=value)
 
     def log_params(self,
         params: Dict[str, Any]
     ):
-        for key, value in params.items():
-            self.log_param(key, value)
+        from mlflow.entities import Param
+
+        if self.batch_logger is not None:
+            for key, value in params.items():
+                self.batch_logger.log_param(self.run_id, key, value)
+            return
+        log_batch_chunked(self.client, self.run_id, params=[Param(key, str(value)) for key, value in params.items()])
 
     def get_params(self
         
     ) -> Union[Dict[str, Any], None]:
         
+        self.flush()
         self.run_object = self.get_run(self.run_name)
         params = self.run_object.data.params
         
@@ -193,41 +324,72 @@ class MLFlowClientWrapper:
     ):
         key = sanitize_mlflow_metric_name(key)
         if is_print:
-            print(f"Logging metric '{key}'={value}")
+            log(f"Logging metric '{key}'={value}")
+        if self.batch_logger is not None:
+            self.batch_logger.log_metric(self.run_id, key, value, step=step)
+            return
         self.client.log_metric(self.run_id, key=key, value=value, step=step, synchronous=False)
 
     def log_metrics(self,
         metrics: Dict[str, float],
-        step: Optional[int] = None
+        step: Optional[int] = None,
+        timestamp: Optional[int] = None
     ):
-        metrics_batch = [Metric(key=key, value=value, timestamp=get_current_time_millis(), step=step) for key, value in metrics.items()]
-        self.client.log_batch(metrics_batch)
+        from mlflow.entities import Metric
+
+        # Names are validated and sanitized in one pass; the whole dict shares one timestamp and step
+        names, values = prepare_mlflow_metrics(metrics)
+        timestamp = timestamp or get_current_time_millis()
+        step = step or 0
+
+        if self.batch_logger is not None:
+            for name, value in zip(names, values):
+                self.batch_logger.log_metric(self.run_id, name, value, step=step, timestamp=timestamp)
+            return
+
+        metrics_batch = [Metric(key=name, value=value, timestamp=timestamp, step=step) for name, value in zip(names, values)]
+        log_batch_chunked(self.client, self.run_id, metrics=metrics_batch)
 
-    @prefix_print("[LOG HISTORICAL METRIC]")
     def log_historical_metric(self,
         key: str,
-        values: Union[float, List[float]],
-        steps: List[int] = None
+        values: Any,
+        steps: List[int] = None,
+        timestamps: List[int] = None,
+        max_workers: int = 8
     ):
-        print(f"Logging historical metric '{key}'")
-        if steps is None:
-            steps = list(i+1 for i in range(len(values)))
-
-        key = sanitize_mlflow_metric_name(key)
-        metrics = [Metric(key=key, value=value, timestamp=get_current_time_millis()+step, step=step) for step, value in zip(steps, values)]
-        self.client.log_batch(run_id=self.run_id, metrics=metrics)
+        self.log_historical_metrics({key: values}, steps=steps, timestamps=timestamps, max_workers=max_workers)
 
+    @prefix_print("[LOG HISTORICAL METRIC]")
     def log_historical_metrics(self,
-        metrics: Dict[str, List[float]],
-        steps: List[int] = None
+        metrics: Any,
+        steps: List[int] = None,
+        timestamps: List[int] = None,
+        max_workers: int = 8
     ):
+        """
+        Bulk-logs whole curves: {key: values} where values is a list, numpy array, Series or DataFrame with
+        'step'/'value'(/'timestamp') columns, or a wide DataFrame with one column per key and steps as the
+        (integer) index. Timestamps are epoch milliseconds or datetimes; all keys are chunked together into
+        limit-sized log_batch requests that are sent concurrently.
+        """
+        if hasattr(metrics, 'columns'):
+            metrics = {column: metrics[column] for column in metrics.columns}
+
+        base_timestamp = get_current_time_millis()
+        metrics_batch = []
         for key, values in metrics.items():
-            self.log_historical_metric(key=key, values=values, steps=steps)
+            curve_values, curve_steps, curve_timestamps = curve_arrays(values, steps, timestamps)
+            metrics_batch.extend(curve_metrics(sanitize_mlflow_metric_name(key), curve_values, curve_steps, curve_timestamps, base_timestamp))
+
+        log(f"Logging {len(metrics_batch):,} values of {len(metrics)} historical metrics")
+        requests = log_batch_concurrent(self.client, self.run_id, metrics=metrics_batch, max_workers=max_workers)
+        log(f"Logged {len(metrics)} historical metrics in {requests} batches")
 
     def get_metrics(self
                     
     ) -> Union[Dict[str,float], None]:
         
+        self.flush()
         self.run_object = self.get_run(self.run_name)
         metrics = self.run_object.data.metrics
 
@@ -243,18 +405,27 @@ class MLFlowClientWrapper:
         key: str,
         value: float
     ):
+        if self.batch_logger is not None:
+            self.batch_logger.set_tag(self.run_id, key, value)
+            return
         self.client.set_tag(self.run_id, key=key, value=value)
 
     def set_tags(self,
         tags: Dict[str, str]
     ):
-        for key, value in tags.items():
-            self.set_tag(key=key, value=value)
+        from mlflow.entities import RunTag
+
+        if self.batch_logger is not None:
+            for key, value in tags.items():
+                self.batch_logger.set_tag(self.run_id, key, value)
+            return
+        log_batch_chunked(self.client, self.run_id, tags=[RunTag(key, str(value)) for key, value in tags.items()])
 
     def get_tags(self
                     
     ) -> Union[Dict[str,str], None]:
         
+        self.flush()
         self.run_object = self.get_run(self.run_name)
         tags = self.run_object.data.tags
 
@@ -272,30 +443,57 @@ class MLFlowClientWrapper:
         artifact_path: str,
         flavor: str,
         signature: Optional[ModelSignature] = None,
-        registered_model_name: Optional[str] = None
+        registered_model_name: Optional[str] = None,
+        max_workers: int = 8
     ):
+        from mlflow.utils.file_utils import TempDir
+
         assert self.run_id is not None, "No active run MLFlow run found. Set the run via set_run() before logging a model"
 
         # Check if artifact path already exists  - Design choice to not overwrite existing paths
-        artifact_paths = [file_info.path for file_info in self.client.list_artifacts(self.run_id)]
-        if artifact_path in artifact_paths:
+        if self.artifact_index.exists(self.run_id, artifact_path):
             raise ValueError(f"The artifact_path '{artifact_path}' already exists in '{self.run_name}'. Please provide a new artifact_path.")
 
         # Check flavor
         if flavor not in self.flavor_lib_dict:
             raise ValueError(f"The flavor '{flavor}' is not yet supported. Please ask the MLE to support your carry.")
+        if registered_model_name is not None:
+            self._require_server("log_model(registered_model_name=...)")
+
+        flavor_lib = self.flavor_lib_dict[flavor]
+
+        # Save locally, then upload the model directory file-parallel instead of flavor.log_model's serial upload
+        with TempDir() as tmp:
+            local_path = tmp.path("model")
+            mlflow_model = mlflow.models.Model(artifact_path=artifact_path, run_id=self.run_id)
+            flavor_lib.save_model(model, path=local_path, mlflow_model=mlflow_model, signature=signature)
+            upload_directory(self.client, self.run_id, local_path, artifact_path, max_workers=max_workers, desc=f"Uploading '{artifact_path}'")
+
+            # Attach the model to the run (mlflow.log-model.history tag); the offline journal has no such record
+            if hasattr(self.client, "_record_logged_model"):
+                self.client._record_logged_model(self.run_id, mlflow_model)
+        self.artifact_index.add(self.run_id, artifact_path)
+
+        # Register the model or not
+        if registered_model_name is not None:
+            mlflow.register_model(f"runs:/{self.run_id}/{artifact_path}", registered_model_name)
+            log(f"Logged a '{flavor}' model in '{artifact_path}' for run '{self.run_name}'. Registered as '{registered_model_name}'")
+        else:
+            log(f"Logged a '{flavor}' model in '{artifact_path}' for run '{self.run_name}'")
 
-        with mlflow.start_run(run_id=self.run_id):
-            flavor_lib = self.flavor_lib_dict[flavor]
-            
-            # Register the model or not
-            if registered_model_name is not None:
-                flavor_lib.log_model(model, artifact_path, signature=signature, registered_model_name=registered_model_name)
-                print(f"Logged a '{flavor}' model in '{artifact_path}' for run '{self.run_name}'")
-            else:
-                flavor_lib.log_model(model, artifact_path, signature=signature)
-                print(f"Logged a '{flavor}' model in '{artifact_path}' for run '{self.run_name}'. Registed as '{registered_model_name}'")
+    @prefix_print("[LOG ARTIFACTS]")
+    def log_artifacts(self,
+        local_dir: str,
+        artifact_path: Optional[str] = None,
+        max_workers: int = 8
+    ):
+        assert self.run_id is not None, "No active run MLFlow run found. Set the run via set_run() before logging artifacts"
 
+        n_files = upload_directory(self.client, self.run_id, local_dir, artifact_path, max_workers=max_workers)
+        for name in os.listdir(local_dir):
+            self.artifact_index.add(self.run_id, "/".join(filter(None, [artifact_path, name])))
+
+        log(f"Logged {n_files} files from '{local_dir}' to '{artifact_path or '/'}' of run '{self.run_name}'")
 
     #############################################################################################################
     #
@@ -309,16 +507,16 @@ class MLFlowClientWrapper:
         registered_model_name: str
     ):
         assert self.run_id is not None, "No active run MLFlow run found. Set the run via set_run() before logging a model"
+        self._require_server("register_model()")
 
         # Check if artifact path already exists 
-        artifact_paths = [file_info.path for file_info in self.client.list_artifacts(self.run_id)]
-        if artifact_path not in artifact_paths:
+        if not self.artifact_index.exists(self.run_id, artifact_path, confirm_miss=True):
             raise ValueError(f"The artifact_path '{artifact_path}' does not exist '{self.run_name}'. Please provide an existing artifact_path.")
         
         model_uri = f"runs:/{self.run_id}/{artifact_path}"
         mlflow.register_model(model_uri=model_uri, name=registered_model_name)
 
-        print(f"Registered '{registered_model_name}' from '{artifact_path}' of run '{self.run_name}'")
+        log(f"Registered '{registered_model_name}' from '{artifact_path}' of run '{self.run_name}'")
 
     #############################################################################################################
     #
@@ -330,20 +528,10 @@ class MLFlowClientWrapper:
     def load_model_from_registry(self,
         registered_model_name: str,
         model_version: str,
-        flavor: Optional[str] = None
+        flavor: Optional[str] = None,
+        use_cache: bool = True
     ):
-        model_uri = f"models:/{registered_model_name}/{model_version}"
-
-        # Check if the registered model name exists raise error if not
-        registered_models = [model_object.name for model_object in self.client.search_registered_models()]
-        if registered_model_name not in registered_models:
-            raise ValueError(f"Registered model '{registered_model_name}' does not exist in MLflow Model Registry.")
-
-        # Check if the model version of the registered model name exists raise error if not
-        try:
-            self.client.get_model_version(registered_model_name, model_version)
-        except Exception as e:
-            raise ValueError(f"Model version '{model_version}' for '{registered_model_name}' does not exist.") from e
+        self._require_server("load_model_from_registry()")
 
         # Default to pyfunc
         if flavor is not None:
@@ -354,9 +542,18 @@ class MLFlowClientWrapper:
         else:
             flavor_lib = mlflow.pyfunc
 
-        model = flavor_lib.load_model(model_uri=model_uri)
+        # Aliases, stages and 'latest' resolve to a concrete version, which also checks that it exists
+        version = version_resolver.resolve(self.client, registered_model_name, model_version)
+
+        if use_cache:
+            model = model_cache.get_or_load(
+                self.client, registered_model_name, version, flavor or "pyfunc",
+                lambda local_path: flavor_lib.load_model(model_uri=local_path)
+            )
+        else:
+            model = flavor_lib.load_model(model_uri=f"models:/{registered_model_name}/{version}")
         
-        print(f"Loaded model '{registered_model_name}' version '{model_version}'")
+        log(f"Loaded model '{registered_model_name}' version '{version}'")
 
         return model
     
@@ -365,16 +562,16 @@ class MLFlowClientWrapper:
         artifact_path: str
     ):
         assert self.run_id is not None, "No active run MLFlow run found. Set the run via set_run() before logging a model"
+        self._require_server("load_model_from_run_artifacts()")
 
         # Check if artifact path already exists - Design choice to not overwrite existing paths
-        artifact_paths = [file_info.path for file_info in self.client.list_artifacts(self.run_id)]
-        if artifact_path not in artifact_paths:
+        if not self.artifact_index.exists(self.run_id, artifact_path, confirm_miss=True):
             raise ValueError(f"The artifact_path '{artifact_path}' does not exist '{self.run_name}'. Please provide an existing artifact_path.")
 
         model_uri = f"runs:/{self.run_id}/{artifact_path}"
         model = mlflow.pyfunc.load_model(model_uri=model_uri)
 
-        print(f"Loaded model from '{artifact_path}' of run '{self.run_name}'")
+        log(f"Loaded model from '{artifact_path}' of run '{self.run_name}'")
 
         return model
     
@@ -389,6 +586,10 @@ class MLFlowClientWrapper:
         image: Any,
         artifact_path: str
     ):  
+        import matplotlib.pyplot as plt
+        from PIL import Image
+        import numpy as np
+
         assert self.run_id is not None, "No active run MLFlow run found. Set the run via set_run() before logging an image."
         assert isinstance(image, (plt.Figure, Image.Image, np.ndarray, mlflow.Image)), "Expected a Matplotlib Figure or PIL Image or numpy.ndarray of mlflow image"
         file_extension = artifact_path.split('.')[-1]
@@ -396,8 +597,7 @@ class MLFlowClientWrapper:
 
         # Check if artifact_path exists
         root_folder = artifact_path.split('/')[0]
-        artifact_paths = [file_info.path for file_info in self.client.list_artifacts(self.run_id)]
-        if root_folder not in artifact_paths:
+        if not self.artifact_index.exists(self.run_id, root_folder, confirm_miss=True):
             raise ValueError(f"The artifact_path '{root_folder}' does not exist in '{self.run_name}'. Please provide an existing artifact_path.")
 
         # Convert Image if given a plt.Figure
@@ -407,8 +607,9 @@ class MLFlowClientWrapper:
             buf.seek(0)
             image = Image.open(buf)
 
-        with mlflow.start_run(run_id=self.run_id):
-            mlflow.log_image(image, artifact_path)
+        # Through the client rather than the fluent API, so it also works against the offline journal
+        self.client.log_image(self.run_id, image, artifact_file=artifact_path)
+        self.artifact_index.add(self.run_id, artifact_path)
         
     #############################################################################################################
     #
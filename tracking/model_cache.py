@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import os
+import glob
+import time
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mlflow.tracking import MlflowClient
+
+DEFAULT_MAX_BYTES = int(os.getenv('MYNTDS_MODEL_CACHE_BYTES', 4 * 1024 ** 3))
+DEFAULT_MAX_DOWNLOAD_BYTES = int(os.getenv('MYNTDS_MODEL_CACHE_DISK_BYTES', 20 * 1024 ** 3))
+DEFAULT_DOWNLOAD_DIR = os.getenv('MYNTDS_MODEL_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'myntds', 'models'))
+
+_STAGES = {'none', 'staging', 'production', 'archived'}
+
+
+def _directory_size(
+    path: str
+) -> int:
+
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def _tracking_uri(
+    client: MlflowClient
+) -> Optional[str]:
+
+    return getattr(getattr(client, '_tracking_client', None), 'tracking_uri', None)
+
+
+def _tracking_key(
+    client: MlflowClient
+) -> str:
+
+    return _tracking_uri(client) or str(id(client))
+
+
+class ModelVersionResolver:
+    """
+    Turns '3', 'champion' / '@champion' (alias), 'Production' (stage) or 'latest' into a concrete version.
+    Numeric versions are immutable and cached for good; aliases and stages move, so they are cached for ttl seconds.
+    """
+
+    def __init__(self,
+        ttl: float = 60
+    ):
+
+        self.ttl = ttl
+        self._versions: Dict[Tuple[str, str, str], Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self,
+        client: MlflowClient,
+        name: str,
+        version: Any
+    ) -> str:
+
+        version = str(version)
+        key = (_tracking_key(client), name, version)
+        entry = self._versions.get(key)
+        if entry is not None and (version.isdigit() or time.monotonic() - entry[0] < self.ttl):
+            return entry[1]
+
+        resolved = self._resolve_remote(client, name, version)
+        with self._lock:
+            self._versions[key] = (time.monotonic(), resolved)
+
+        return resolved
+
+    @staticmethod
+    def _resolve_remote(
+        client: MlflowClient,
+        name: str,
+        version: str
+    ) -> str:
+
+        from mlflow.exceptions import MlflowException
+
+        # Only "not found" answers become ValueError; connection and other errors propagate unchanged
+        try:
+            if version.isdigit():
+                return str(client.get_model_version(name, version).version)
+            if version.lower() == 'latest' or version.lower() in _STAGES:
+                latest = ModelVersionResolver._latest_version(client, name, None if version.lower() == 'latest' else version.lower())
+                if latest is None:
+                    raise ValueError(f"Model version '{version}' for '{name}' does not exist.")
+                return latest
+            return str(client.get_model_version_by_alias(name, version.lstrip('@')).version)
+        except MlflowException as e:
+            # Missing models and versions are RESOURCE_DOES_NOT_EXIST; missing aliases INVALID_PARAMETER_VALUE
+            if e.error_code not in ('RESOURCE_DOES_NOT_EXIST', 'INVALID_PARAMETER_VALUE'):
+                raise
+            raise ValueError(f"Model version '{version}' for '{name}' does not exist.") from e
+
+    @staticmethod
+    def _latest_version(
+        client: MlflowClient,
+        name: str,
+        stage: Optional[str] = None
+    ) -> Optional[str]:
+
+        # search_model_versions instead of the deprecated get_latest_versions
+        quote = '"' if "'" in name else "'"
+        versions = [
+            int(model_version.version) for model_version in client.search_model_versions(f'name={quote}{name}{quote}')
+            if stage is None or (model_version.current_stage or 'None').lower() == stage
+        ]
+
+        return str(max(versions)) if versions else None
+
+
+class ModelCache:
+    """
+    Process-wide LRU of deserialized models keyed by (tracking uri, name, version, flavor), bounded by the
+    on-disk size of each model's artifacts as a proxy for its memory footprint. Artifacts are downloaded
+    once per version into download_dir, which is shared by every process on the host and trimmed to
+    max_download_bytes by least recent use whenever a new version is downloaded.
+    """
+
+    def __init__(self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        download_dir: Optional[str] = DEFAULT_DOWNLOAD_DIR,
+        max_download_bytes: int = DEFAULT_MAX_DOWNLOAD_BYTES
+    ):
+
+        self.max_bytes = max_bytes
+        self.download_dir = download_dir
+        self.max_download_bytes = max_download_bytes
+        self.hits = 0
+        self.misses = 0
+        self._models: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+
+    def local_path(self,
+        client: MlflowClient,
+        name: str,
+        version: str
+    ) -> str:
+
+        model_uri = f'models:/{name}/{version}'
+        if self.download_dir is not None:
+            # A registered version never changes, so a completed download is valid forever
+            uri_digest = hashlib.sha256(_tracking_key(client).encode()).hexdigest()[:16]
+            path = os.path.join(self.download_dir, uri_digest, name, str(version))
+            if os.path.isdir(path):
+                os.utime(path)              # bump recency for the download eviction
+                return path
+
+        import mlflow
+
+        if self.download_dir is None:
+            return mlflow.artifacts.download_artifacts(artifact_uri=model_uri, tracking_uri=_tracking_uri(client))
+
+        # Download next to the target and publish with an atomic rename
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        os.makedirs(tmp_path, exist_ok=True)
+        try:
+            downloaded = mlflow.artifacts.download_artifacts(artifact_uri=model_uri, dst_path=tmp_path, tracking_uri=_tracking_uri(client))
+            try:
+                os.rename(downloaded, path)
+            except OSError:
+                if not os.path.isdir(path):         # lost a race against another process: keep its copy
+                    raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        self._evict_downloads(keep=path)
+
+        return path
+
+    def _evict_downloads(self,
+        keep: str
+    ):
+
+        # Version directories sit at download_dir/<tracking uri digest>/<name>/<version>; names cannot contain '/'
+        entries = []
+        for path in glob.glob(os.path.join(self.download_dir, '*', '*', '*')):
+            if path.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            try:
+                entries.append((os.path.getmtime(path), _directory_size(path), path))
+            except FileNotFoundError:
+                continue
+
+        # The version just downloaded always stays, even when it alone exceeds max_download_bytes
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_download_bytes:
+                break
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def get_or_load(self,
+        client: MlflowClient,
+        name: str,
+        version: str,
+        flavor: str,
+        load_fn: Callable[[str], Any]
+    ) -> Any:
+
+        key = (_tracking_key(client), name, str(version), flavor)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+            loading_lock = self._loading.setdefault(key, threading.Lock())
+
+        # One thread loads a given model; concurrent callers wait for it instead of loading it again
+        with loading_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key][0]
+
+            try:
+                path = self.local_path(client, name, version)
+                model = load_fn(path)
+                size = _directory_size(path)
+
+                with self._lock:
+                    self.misses += 1
+                    self._models[key] = (model, size)
+                    self._evict()
+            finally:
+                # Also after a failed load, so failures do not leave a lock behind per key
+                with self._lock:
+                    self._loading.pop(key, None)
+
+        return model
+
+    def _evict(self):
+
+        # The newest entry always stays, even when it alone exceeds max_bytes
+        total = sum(size for _, size in self._models.values())
+        while total > self.max_bytes and len(self._models) > 1:
+            _, (_, size) = self._models.popitem(last=False)
+            total -= size
+
+    def clear(self):
+
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> Dict[str, int]:
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'models': len(self._models),
+                'bytes': sum(size for _, size in self._models.values()),
+            }
+
+
+# Shared by every MLFlowClientWrapper in the process
+model_cache = ModelCache()
+version_resolver = ModelVersionResolver()
@@ -1,49 +1,101 @@
 import re
+import sys
 import time
+import inspect
+import logging
 import functools
-import sys
+import contextvars
+
+# Prefix of the innermost prefix_print-decorated call, per thread and per asyncio task
+_prefix = contextvars.ContextVar("prefix", default="")
+
+logger = logging.getLogger("myntds.tracking")
+
+
+class _StdStreamHandler(logging.StreamHandler):
+    """StreamHandler bound to whatever sys.stdout / sys.stderr is at emit time (notebooks replace them)."""
+
+    def __init__(self, stream_name, levels):
+        self.stream_name = stream_name
+        super().__init__()
+        self.addFilter(lambda record: record.levelno in levels)
+
+    @property
+    def stream(self):
+        return getattr(sys, self.stream_name)
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _PrefixFormatter(logging.Formatter):
+
+    def format(self, record):
+        prefix = getattr(record, "prefix", "")
+        error = "ERROR: " if record.levelno >= logging.ERROR else ""
+        return f"{prefix} {error}{record.getMessage()}" if prefix else f"{error}{record.getMessage()}"
+
+
+class _PrefixFilter(logging.Filter):
+
+    def filter(self, record):
+        record.prefix = _prefix.get()
+        return True
 
-import functools
-import sys
-import traceback
+
+def _configure_logger():
+    # Handlers are created once per process, not per call
+    if logger.handlers:
+        return
+    formatter = _PrefixFormatter()
+    for stream_name, levels in (("stdout", range(logging.WARNING)), ("stderr", range(logging.WARNING, logging.CRITICAL + 1))):
+        handler = _StdStreamHandler(stream_name, levels)
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.addFilter(_PrefixFilter())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_configure_logger()
+
+
+def log(message):
+    """Replacement for print() inside prefix_print-decorated methods; a no-op when INFO is disabled."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(message)
+
+def set_verbosity(level=logging.INFO):
+    """logging.WARNING silences progress messages and keeps errors; logging.CRITICAL + 1 silences everything."""
+    logger.setLevel(level)
 
 def prefix_print(prefix=""):
-    """Decorator that prefixes print statements and errors with a customizable string."""
+    """Decorator that prefixes log() messages and errors with a customizable string."""
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                token = _prefix.set(prefix)
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    logger.error(f"{type(e).__name__}: {e}")
+                    raise
+                finally:
+                    _prefix.reset(token)
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            original_stdout = sys.stdout  # Save original stdout
-            original_stderr = sys.stderr  # Save original stderr
-            
-            class PrintInterceptor:
-                def write(self, message):
-                    if message.strip():  # Avoid empty lines
-                        original_stdout.write(f"{prefix} {message}\n")
-                
-                def flush(self):  # Needed for interactive environments
-                    original_stdout.flush()
-
-            class ErrorInterceptor:
-                def write(self, message):
-                    if message.strip():
-                        original_stderr.write(f"{prefix} ERROR: {message}\n")
-                
-                def flush(self):
-                    original_stderr.flush()
-
-            sys.stdout = PrintInterceptor()  # Redirect stdout
-            sys.stderr = ErrorInterceptor()  # Redirect stderr
-            
+            token = _prefix.set(prefix)
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                error_msg = "".join(traceback.format_exception_only(type(e), e))  # Get error message only
-                sys.stderr.write(error_msg)
-                raise  # Re-raise exception so it behaves normally
+                logger.error(f"{type(e).__name__}: {e}")    # error message only, like the traceback's last line
+                raise                                       # Re-raise exception so it behaves normally
             finally:
-                sys.stdout = original_stdout  # Restore stdout
-                sys.stderr = original_stderr  # Restore stderr
-        
+                _prefix.reset(token)
+
         return wrapper
     return decorator
 
@@ -53,10 +105,43 @@ def get_current_time_millis():
     """
     return int(time.time() * 1000)
 
+_INVALID_METRIC_CHARS = re.compile(r"[^a-zA-Z0-9_\-./ ]")
+_INVALID_METRIC_CHARS_JOINED = re.compile(r"[^a-zA-Z0-9_\-./ \n]")
+MAX_METRIC_NAME_LENGTH = 250
+
 def sanitize_mlflow_metric_name(name: str) -> str:
     """
     Convert a string to conform to MLflow's metric name rules:
     - Only allows alphanumerics, underscores (_), dashes (-), periods (.), spaces ( ), and slashes (/)
     - Replaces any invalid character with an underscore (_)
     """
-    return re.sub(r"[^a-zA-Z0-9_\-./ ]", "_", name)
\ No newline at end of file
+    return _INVALID_METRIC_CHARS.sub("_", name)
+
+def sanitize_mlflow_metric_names(names: list) -> list:
+    """
+    sanitize_mlflow_metric_name over many names with a single regex pass: the names are joined by newlines,
+    which the joined pattern keeps, and split again afterwards.
+    """
+    names = [str(name) for name in names]
+    joined = "\n".join(names)
+    if joined.count("\n") != len(names) - 1:          # a name contains a newline itself
+        return [sanitize_mlflow_metric_name(name) for name in names]
+
+    return _INVALID_METRIC_CHARS_JOINED.sub("_", joined).split("\n") if names else []
+
+def prepare_mlflow_metrics(metrics: dict) -> tuple:
+    """
+    Validates and sanitizes a {name: value} dict once for a batch. Returns (names, values) as lists.
+    """
+    names = sanitize_mlflow_metric_names(list(metrics.keys()))
+
+    values = []
+    for name, value in zip(names, metrics.values()):
+        if not name or len(name) > MAX_METRIC_NAME_LENGTH:
+            raise ValueError(f"Metric name '{name}' must be between 1 and {MAX_METRIC_NAME_LENGTH} characters")
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Metric '{name}' has a non-numeric value {value!r}") from e
+
+    return names, values
\ No newline at end of file